@@ -0,0 +1,64 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MicroBatcher:
+    """Collects concurrent requests for up to `max_wait_ms` and runs them as one batch.
+
+    `run_batch` receives a list of items and must return one result per item,
+    in the same order. Results are scattered back to the waiting callers.
+    """
+
+    def __init__(self, run_batch, max_batch_size=8, max_wait_ms=5, workers=1):
+        self.run_batch = run_batch
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self.workers = max(1, int(workers))
+        self._queue = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def submit(self, item):
+        """Queue one item and block until its batch has run"""
+        if self.max_batch_size == 1:
+            return self.run_batch([item])[0]
+
+        self._ensure_workers()
+        future = Future()
+        self._queue.put((item, future))
+        return future.result()
+
+    def _ensure_workers(self):
+        if len(self._threads) < self.workers:
+            with self._lock:
+                while len(self._threads) < self.workers:
+                    thread = threading.Thread(target=self._work, daemon=True)
+                    thread.start()
+                    self._threads.append(thread)
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _work(self):
+        while True:
+            batch = self._collect()
+            try:
+                results = self.run_batch([item for item, _ in batch])
+                for (_, future), result in zip(batch, results):
+                    future.set_result(result)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
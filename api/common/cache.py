@@ -0,0 +1,82 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from api.common.config import PREDICTION_CACHE_MAX_ENTRIES, PREDICTION_CACHE_TTL
+
+
+def image_key(image_bytes, *parts):
+    """blake2b of the raw upload plus everything else the result depends on (model version, age...)"""
+    digest = hashlib.blake2b(image_bytes, digest_size=16)
+    for part in parts:
+        digest.update(f"|{part}".encode())
+    return digest.hexdigest()
+
+
+class PredictionCache:
+    """Bounded LRU cache of prediction results that expire after `ttl` seconds.
+
+    Only successful results are stored. Callers get a copy, so a cached result
+    cannot be changed by a request that edits its response.
+    """
+
+    def __init__(self, max_entries=512, ttl=600):
+        self.max_entries = max(0, int(max_entries))
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get_or_compute(self, key, compute):
+        """Return the cached result for `key`, or run `compute` and store its result"""
+        if self.max_entries == 0:
+            return compute()
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                self._expirations += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return copy.deepcopy(entry[1])
+            self._misses += 1
+
+        value = compute()
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+                'evictions': self._evictions,
+                'expirations': self._expirations
+            }
+
+
+# Shared by the disease and deficiency image endpoints
+prediction_cache = PredictionCache(PREDICTION_CACHE_MAX_ENTRIES, PREDICTION_CACHE_TTL)
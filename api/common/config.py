@@ -0,0 +1,73 @@
+import os
+
+
+def _env_flag(name, default=False):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+# Load and trace every LSTM model in create_app() instead of on first request
+PRELOAD_MODELS = _env_flag('PRELOAD_MODELS')
+PRELOAD_WORKERS = int(os.getenv('PRELOAD_WORKERS', '4'))
+# Run that preloading and the reloader start-up on a background thread so /health answers right away
+PRELOAD_IN_BACKGROUND = _env_flag('PRELOAD_IN_BACKGROUND', True)
+
+# Optional caps for the LSTM model registries, 0 means unlimited
+MODEL_CACHE_MAX_ENTRIES = int(os.getenv('MODEL_CACHE_MAX_ENTRIES', '0'))
+MODEL_CACHE_MAX_BYTES = int(float(os.getenv('MODEL_CACHE_MAX_MB', '0')) * 1024 * 1024)
+
+# Seconds between checks for new model artifacts or latest_data.csv, 0 disables hot reload
+MODEL_RELOAD_INTERVAL = float(os.getenv('MODEL_RELOAD_INTERVAL', '60'))
+
+# Score small CatBoost price inputs with NumPy-compiled trees instead of CatBoost predict
+CATBOOST_COMPILED_SCORING = _env_flag('CATBOOST_COMPILED_SCORING')
+
+# Row and point caps for the CatBoost price batch and scenario-grid endpoints
+NEW_PRICE_BATCH_MAX_ROWS = int(os.getenv('NEW_PRICE_BATCH_MAX_ROWS', '10000'))
+NEW_PRICE_GRID_MAX_POINTS = int(os.getenv('NEW_PRICE_GRID_MAX_POINTS', '100000'))
+
+# Seconds clients may reuse /api/pepper/catalog before revalidating it with its ETag
+PEPPER_CATALOG_MAX_AGE = int(os.getenv('PEPPER_CATALOG_MAX_AGE', '3600'))
+
+# Largest request accepted by /api/pepper/suggest-pepper-batch
+PEPPER_BATCH_MAX_ROWS = int(os.getenv('PEPPER_BATCH_MAX_ROWS', '5000'))
+
+# Precomputed variety for every known district / DS division / soil texture combination,
+# generated next to the recommendation model in models/ whatever the working directory
+PEPPER_RECOMMENDATION_MAP = os.getenv(
+    'PEPPER_RECOMMENDATION_MAP',
+    os.path.normpath(os.path.join(os.path.dirname(__file__), '..', '..', 'models', 'recommendation_map.joblib'))
+)
+
+# Dynamic batching in front of the disease detection interpreter, off (1) by default:
+# measure with benchmarks/bench_disease_batching.py before raising it
+DISEASE_BATCH_MAX_SIZE = int(os.getenv('DISEASE_BATCH_MAX_SIZE', '1'))
+DISEASE_BATCH_MAX_WAIT_MS = float(os.getenv('DISEASE_BATCH_MAX_WAIT_MS', '5'))
+
+# Interpreters per TFLite model (concurrent requests) and intra-op threads per interpreter
+TFLITE_POOL_SIZE = int(os.getenv('TFLITE_POOL_SIZE', '2'))
+TFLITE_NUM_THREADS = int(os.getenv('TFLITE_NUM_THREADS', '0')) or None
+
+# TFLite model variant to load: "float", or a suffix such as "float16" / "int8" that selects
+# `<model>_<suffix>.tflite` next to the float model when that file exists
+TFLITE_MODEL_VARIANT = os.getenv('TFLITE_MODEL_VARIANT', 'float').strip().lower()
+
+# TFLite interpreter backend: "auto" (tflite_runtime, then ai_edge_litert, then tensorflow)
+# or one of those names to require it
+TFLITE_BACKEND = os.getenv('TFLITE_BACKEND', 'auto').strip().lower()
+
+# Leaf gate + deficiency cascade: "sequential", "concurrent" or "combined" (two-head model)
+DEFICIENCY_CASCADE_MODE = os.getenv('DEFICIENCY_CASCADE_MODE', 'concurrent').strip().lower()
+DEFICIENCY_LEAF_THRESHOLD = float(os.getenv('DEFICIENCY_LEAF_THRESHOLD', '0.8'))
+DEFICIENCY_COMBINED_MODEL = os.getenv('DEFICIENCY_COMBINED_MODEL', 'models/leafDeficiencyCombined.tflite')
+
+# Result cache for repeated image uploads: entries (0 disables) and seconds before expiry
+PREDICTION_CACHE_MAX_ENTRIES = int(os.getenv('PREDICTION_CACHE_MAX_ENTRIES', '512'))
+PREDICTION_CACHE_TTL = float(os.getenv('PREDICTION_CACHE_TTL', '600'))
+
+# Multi-image batch endpoints
+BATCH_MAX_FILES = int(os.getenv('BATCH_MAX_FILES', '64'))
+BATCH_INFERENCE_SIZE = int(os.getenv('BATCH_INFERENCE_SIZE', '8'))
+IMAGE_DECODE_WORKERS = int(os.getenv('IMAGE_DECODE_WORKERS', '4'))
@@ -0,0 +1,5 @@
+class InvalidInputError(ValueError):
+    """A request value the service cannot serve (e.g. a date outside the forecastable range).
+
+    Services raise it before wrapping other failures, routes answer it with 400.
+    """
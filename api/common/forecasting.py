@@ -0,0 +1,210 @@
+import json
+import threading
+import numpy as np
+import tensorflow as tf
+from api.common.utils import artifact_version
+
+
+def _rollout_loop(step_fn, sequence, steps):
+    """Feed each prediction back into the window for `steps` months"""
+    outputs = tf.TensorArray(tf.float32, size=steps, element_shape=tf.TensorShape([None]))
+    window = sequence
+    for i in tf.range(steps):
+        next_value = step_fn(window)
+        outputs = outputs.write(i, next_value)
+        window = tf.concat([window[:, 1:, :], next_value[:, tf.newaxis, tf.newaxis]], axis=1)
+    return tf.transpose(outputs.stack())
+
+
+class ForecastEngine:
+    """Autoregressive LSTM rollout compiled into a single TensorFlow graph"""
+
+    def __init__(self, model):
+        self.model = model
+        self._rollout = tf.function(
+            self._rollout_graph,
+            input_signature=[
+                tf.TensorSpec(shape=[None, None, 1], dtype=tf.float32),
+                tf.TensorSpec(shape=[], dtype=tf.int32)
+            ]
+        )
+
+    def _step(self, window):
+        return tf.reshape(self.model(window, training=False), [tf.shape(window)[0], -1])[:, 0]
+
+    def _rollout_graph(self, sequence, steps):
+        return _rollout_loop(self._step, sequence, steps)
+
+    def rollout(self, sequence, steps):
+        """Return the scaled trajectory for every month up to `steps`, shape (batch, steps)"""
+        if steps < 1:
+            raise ValueError("Forecast horizon must be at least one month")
+        sequence = np.asarray(sequence, dtype=np.float32)
+        if sequence.ndim == 2:
+            sequence = sequence[np.newaxis, ...]
+        return self._rollout(tf.constant(sequence), tf.constant(int(steps), dtype=tf.int32)).numpy()
+
+
+def bundle_version(model_dir):
+    """Fingerprint of an LSTM bundle directory: the model, its components and latest data"""
+    return artifact_version(
+        model_dir / "lstm_model.h5",
+        model_dir / "model_components.pkl",
+        model_dir / "latest_data.csv"
+    )
+
+
+def trace_bundle(model_info):
+    """Run one dummy rollout so the bundle's graph is traced before it serves requests"""
+    seq_length = model_info['params']['seq_length']
+    model_info['engine'].rollout(np.zeros((1, seq_length, 1)), 1)
+
+
+def architecture_signature(model):
+    """Layer types and configs without layer names, used to group compatible models"""
+    layers = []
+    for layer in model.layers:
+        config = {k: v for k, v in layer.get_config().items() if k != 'name'}
+        layers.append([layer.__class__.__name__, config])
+    return json.dumps(layers, sort_keys=True, default=str)
+
+
+def stack_layout(model):
+    """Layer plan and float32 weights of an LSTM/Dense model for StackedForecastEngine.
+
+    Returns None for models with other layers, those keep their own ForecastEngine.
+    """
+    plan, weights = [], []
+    for layer in model.layers:
+        kind = layer.__class__.__name__
+        config = layer.get_config()
+        if kind == 'Dropout':
+            continue
+        if kind == 'LSTM' and not (config.get('go_backwards') or config.get('stateful')):
+            spec = ('lstm', config['activation'], config['recurrent_activation'], config['return_sequences'])
+        elif kind == 'Dense':
+            spec = ('dense', config['activation'])
+        else:
+            return None
+        if not (isinstance(config['activation'], str) and isinstance(config.get('recurrent_activation', ''), str)):
+            return None
+        arrays = layer.get_weights()
+        if not config['use_bias']:
+            arrays.append(np.zeros(arrays[0].shape[-1]))
+        plan.append(spec)
+        weights.extend(np.asarray(array, dtype=np.float32) for array in arrays)
+    return tuple(plan), weights
+
+
+class StackedForecastEngine:
+    """Rolls several models with one layer plan forward as a single batch.
+
+    Row g of the window is fed to model g: each weight is passed stacked along a
+    leading model axis and every LSTM/Dense step is one einsum over that axis, so a
+    month costs the same few kernels for one model or a whole group. Shorter windows
+    are left-padded to `window_length` and the LSTM state is held at zero over the
+    padding, which gives the same result as running them unpadded.
+    """
+
+    def __init__(self, plan, window_length):
+        self.plan = plan
+        self.window_length = window_length
+        weight_specs = []
+        for spec in plan:
+            ranks = (3, 3, 2) if spec[0] == 'lstm' else (3, 2)
+            weight_specs.extend(tf.TensorSpec(shape=[None] * rank, dtype=tf.float32) for rank in ranks)
+        self._rollout = tf.function(
+            self._rollout_graph,
+            input_signature=[
+                tf.TensorSpec(shape=[None, window_length, 1], dtype=tf.float32),
+                tf.TensorSpec(shape=[None], dtype=tf.int32),
+                tf.TensorSpec(shape=[], dtype=tf.int32),
+                weight_specs
+            ]
+        )
+
+    @staticmethod
+    def _lstm(x, starts, kernel, recurrent_kernel, bias, activation, recurrent_activation, return_sequences):
+        activation = tf.keras.activations.get(activation)
+        recurrent_activation = tf.keras.activations.get(recurrent_activation)
+        state_shape = tf.stack([tf.shape(x)[0], tf.shape(recurrent_kernel)[1]])
+        h = tf.zeros(state_shape)
+        c = tf.zeros(state_shape)
+        inputs = tf.einsum('gtf,gfk->gtk', x, kernel) + bias[:, tf.newaxis]
+        outputs = []
+        for t in range(x.shape[1]):
+            z = inputs[:, t] + tf.einsum('gu,guk->gk', h, recurrent_kernel)
+            i, f, candidate, o = tf.split(z, 4, axis=-1)
+            active = (t >= starts)[:, tf.newaxis]
+            c = tf.where(active, recurrent_activation(f) * c + recurrent_activation(i) * activation(candidate), c)
+            h = tf.where(active, recurrent_activation(o) * activation(c), h)
+            outputs.append(h)
+        return tf.stack(outputs, axis=1) if return_sequences else h
+
+    def _step(self, window, starts, weights):
+        x = window
+        position = 0
+        for spec in self.plan:
+            if spec[0] == 'lstm':
+                x = self._lstm(x, starts, *weights[position:position + 3], *spec[1:])
+                position += 3
+            else:
+                kernel, bias = weights[position:position + 2]
+                x = tf.keras.activations.get(spec[1])(tf.einsum('gf,gfo->go', x, kernel) + bias)
+                position += 2
+        return x[:, 0]
+
+    def _rollout_graph(self, windows, starts, steps, weights):
+        return _rollout_loop(lambda window: self._step(window, starts, weights), windows, steps)
+
+    def rollout(self, sequences, steps, weights):
+        """Return the scaled trajectories of every stacked model, shape (models, steps).
+
+        `sequences` holds one input window per model, each at most `window_length` long.
+        """
+        if steps < 1:
+            raise ValueError("Forecast horizon must be at least one month")
+        windows = np.zeros((len(sequences), self.window_length, 1), dtype=np.float32)
+        starts = np.zeros(len(sequences), dtype=np.int32)
+        for row, sequence in enumerate(sequences):
+            sequence = np.asarray(sequence, dtype=np.float32).reshape(-1)
+            if len(sequence) > self.window_length:
+                raise ValueError(f"Window of {len(sequence)} does not fit an engine of length {self.window_length}")
+            starts[row] = self.window_length - len(sequence)
+            windows[row, starts[row]:, 0] = sequence
+        weights = [tf.constant(np.asarray(w, dtype=np.float32)) for w in weights]
+        return self._rollout(
+            tf.constant(windows), tf.constant(starts), tf.constant(int(steps), dtype=tf.int32), weights
+        ).numpy()
+
+
+class ForecastCache:
+    """Keeps the longest trajectory computed so far for each forecast key"""
+
+    def __init__(self):
+        self._paths = {}
+        self._lock = threading.Lock()
+
+    def get_path(self, key, steps, compute):
+        """Return the first `steps` months, extending the stored rollout with `compute` if needed"""
+        with self._lock:
+            path = self._paths.get(key)
+        if path is not None and len(path) >= steps:
+            return path[:steps]
+
+        path = np.asarray(compute(steps))
+        path.setflags(write=False)
+        with self._lock:
+            current = self._paths.get(key)
+            if current is None or len(current) < len(path):
+                self._paths[key] = path
+        return path[:steps]
+
+    def invalidate(self, name=None):
+        """Drop cached paths for one model name (first key element), or all of them"""
+        with self._lock:
+            if name is None:
+                self._paths.clear()
+            else:
+                for key in [k for k in self._paths if k[0] == name]:
+                    del self._paths[key]
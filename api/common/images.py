@@ -0,0 +1,79 @@
+import io
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PIL import Image, UnidentifiedImageError
+from api.common.config import IMAGE_DECODE_WORKERS
+
+# Pillow releases the GIL while decoding, so uploads decode in parallel on threads
+decode_executor = ThreadPoolExecutor(max_workers=max(1, IMAGE_DECODE_WORKERS))
+
+
+def open_image(source, draft_size=None):
+    """Open an image from bytes, a path or a file-like object without touching disk.
+
+    With `draft_size`, JPEGs are put in draft mode so libjpeg decodes directly at
+    1/2, 1/4 or 1/8 scale, never below that size. A 12 MP photo is therefore never
+    fully decoded only to be shrunk to model resolution. Draft decoding changes
+    pixel values slightly, so callers opt in per model.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    try:
+        img = Image.open(source)
+    except UnidentifiedImageError:
+        raise ValueError("Uploaded file is not a valid image")
+    if draft_size is not None and img.format == 'JPEG':
+        img.draft('RGB', draft_size)
+    return img
+
+
+def image_to_tensor(image, size):
+    """Decode and resize once into a (1, height, width, 3) float32 batch scaled to 0-1.
+
+    Full-resolution decode, the 64x64 deficiency and leaf models see the same
+    pixels as before draft decoding was introduced.
+    """
+    img = open_image(image)
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    img = img.resize(size)
+
+    img_array = np.array(img, dtype=np.float32)
+    np.divide(img_array, 255.0, out=img_array)
+    return img_array[np.newaxis, ...]
+
+
+def predict_in_order(images, preprocess, predict_batch, chunk_size):
+    """Decode images in parallel and run batched inference, yielding (index, output, error) in order.
+
+    `images` may contain exceptions for uploads rejected before decoding, those
+    are reported as errors. `predict_batch` receives a stacked batch of up to
+    `chunk_size` tensors and returns one output per row.
+    """
+    futures = [
+        image if isinstance(image, Exception) else decode_executor.submit(preprocess, image)
+        for image in images
+    ]
+    chunk_size = max(1, chunk_size)
+    for start in range(0, len(futures), chunk_size):
+        indices = range(start, min(start + chunk_size, len(futures)))
+        errors = {}
+        ready = []
+        for i in indices:
+            try:
+                if isinstance(futures[i], Exception):
+                    raise futures[i]
+                ready.append((i, futures[i].result()))
+            except Exception as e:
+                errors[i] = e
+
+        outputs = {}
+        if ready:
+            try:
+                batch_outputs = predict_batch(np.concatenate([tensor for _, tensor in ready], axis=0))
+                outputs = {i: output for (i, _), output in zip(ready, batch_outputs)}
+            except Exception as e:
+                errors.update({i: e for i, _ in ready})
+
+        for i in indices:
+            yield i, outputs.get(i), errors.get(i)
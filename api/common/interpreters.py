@@ -0,0 +1,202 @@
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+from api.common.config import TFLITE_MODEL_VARIANT, TFLITE_BACKEND
+
+
+def _tflite_runtime_interpreter():
+    from tflite_runtime.interpreter import Interpreter
+    return Interpreter
+
+
+def _ai_edge_litert_interpreter():
+    from ai_edge_litert.interpreter import Interpreter
+    return Interpreter
+
+
+def _tensorflow_interpreter():
+    import tensorflow as tf
+    return tf.lite.Interpreter
+
+
+# In "auto" order: the standalone runtimes are a few MB, full TensorFlow is hundreds
+TFLITE_BACKENDS = {
+    'tflite_runtime': _tflite_runtime_interpreter,
+    'ai_edge_litert': _ai_edge_litert_interpreter,
+    'tensorflow': _tensorflow_interpreter
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def interpreter_backend(backend=TFLITE_BACKEND):
+    """(name, Interpreter class) of the TFLite backend, imported once per process"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _load_backend(backend)
+    return _backend
+
+
+def _load_backend(backend):
+    if backend != 'auto' and backend not in TFLITE_BACKENDS:
+        raise ValueError(f"TFLITE_BACKEND must be auto or one of {', '.join(TFLITE_BACKENDS)}")
+    names = list(TFLITE_BACKENDS) if backend == 'auto' else [backend]
+    for name in names:
+        try:
+            interpreter_class = TFLITE_BACKENDS[name]()
+        except ImportError:
+            continue
+        print(f"Using the {name} TFLite interpreter")
+        return name, interpreter_class
+    raise RuntimeError(f"No TFLite interpreter available, tried {', '.join(names)}")
+
+
+def active_backend():
+    """Name of the loaded TFLite backend, None until the first interpreter is created"""
+    return _backend[0] if _backend is not None else None
+
+
+def resolve_model_variant(model_path, variant=TFLITE_MODEL_VARIANT):
+    """Path of the `<name>_<variant>.tflite` file next to a float model, or the float model if it is missing"""
+    if not variant or variant == 'float':
+        return model_path
+    root, ext = os.path.splitext(model_path)
+    variant_path = f"{root}_{variant}{ext}"
+    if os.path.exists(variant_path):
+        return variant_path
+    print(f"No {variant} variant at {variant_path}, using {model_path}")
+    return model_path
+
+
+def tensor_quantization(detail):
+    """(scale, zero_point, dtype) of an int8/uint8 tensor, None for float tensors"""
+    if not np.issubdtype(detail['dtype'], np.integer):
+        return None
+    scale, zero_point = detail['quantization']
+    if not scale:
+        return None
+    return scale, zero_point, detail['dtype']
+
+
+def quantize(values, quantization):
+    scale, zero_point, dtype = quantization
+    limits = np.iinfo(dtype)
+    return np.clip(np.round(values / scale + zero_point), limits.min, limits.max).astype(dtype)
+
+
+def dequantize(values, quantization):
+    scale, zero_point, _ = quantization
+    return (values.astype(np.float32) - zero_point) * np.float32(scale)
+
+
+class PooledInterpreter:
+    """One TFLite interpreter with its tensor details cached.
+
+    Loading by `model_path` lets TFLite memory-map the flatbuffer, so every
+    process serving the same file shares its read-only pages through the page
+    cache. Float16 variants take float32 input like the float models. For int8/uint8
+    variants, float input is quantized and integer outputs are dequantized with
+    the scale and zero point from the tensor details, so callers never see them.
+    """
+
+    def __init__(self, model_path, num_threads=None):
+        _, interpreter_class = interpreter_backend()
+        self.interpreter = interpreter_class(model_path=model_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self.input_details = self.interpreter.get_input_details()
+        self.output_details = self.interpreter.get_output_details()
+        self.batch_size = int(self.input_details[0]['shape'][0])
+        self.input_quantization = tensor_quantization(self.input_details[0])
+        self.output_quantization = [tensor_quantization(detail) for detail in self.output_details]
+
+    def invoke(self, batch, all_outputs=False):
+        """Run one invoke over a stacked batch, resizing the input when the batch size changes"""
+        input_index = self.input_details[0]['index']
+        if batch.shape[0] != self.batch_size:
+            self.batch_size = None
+            self.interpreter.resize_tensor_input(input_index, list(batch.shape))
+            self.interpreter.allocate_tensors()
+            self.batch_size = batch.shape[0]
+
+        if self.input_quantization is not None:
+            batch = quantize(batch, self.input_quantization)
+        self.interpreter.set_tensor(input_index, batch)
+        self.interpreter.invoke()
+        if all_outputs:
+            return [self._output(i) for i in range(len(self.output_details))]
+        return self._output(0)
+
+    def _output(self, position):
+        values = self.interpreter.get_tensor(self.output_details[position]['index'])
+        quantization = self.output_quantization[position]
+        return values if quantization is None else dequantize(values, quantization)
+
+
+class InterpreterPool:
+    """Fixed number of interpreters for one model, checked out by one request thread at a time.
+
+    TFLite interpreters are not thread-safe, so each concurrent caller gets its
+    own slot. `num_threads` sets the intra-op threads of every interpreter.
+    """
+
+    def __init__(self, model_path, size=2, num_threads=None):
+        self.model_path = model_path
+        self.size = max(1, int(size))
+        self.num_threads = num_threads or None
+        self.supports_batching = True
+        self._slots = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+        first = self._create()
+        self.input_details = first.input_details
+        self.output_details = first.output_details
+        self._slots.put(first)
+
+    def _create(self):
+        slot = PooledInterpreter(self.model_path, self.num_threads)
+        self._created += 1
+        return slot
+
+    def _acquire(self):
+        try:
+            return self._slots.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                return self._create()
+        return self._slots.get()
+
+    @contextmanager
+    def checkout(self):
+        slot = self._acquire()
+        try:
+            yield slot
+        finally:
+            self._slots.put(slot)
+
+    def run(self, batch, all_outputs=False):
+        """Invoke on a free interpreter, one image at a time for models with a fixed batch size.
+
+        Returns the first output, or a list of every output head with `all_outputs`.
+        """
+        batch = np.ascontiguousarray(batch)
+        with self.checkout() as slot:
+            if self.supports_batching or len(batch) == 1:
+                try:
+                    return slot.invoke(batch, all_outputs)
+                except (ValueError, RuntimeError):
+                    if len(batch) == 1:
+                        raise
+                    self.supports_batching = False
+            outputs = [slot.invoke(batch[i:i + 1], True) for i in range(len(batch))]
+        heads = [np.concatenate(head) for head in zip(*outputs)]
+        return heads if all_outputs else heads[0]
@@ -0,0 +1,188 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from types import MappingProxyType
+
+import numpy as np
+
+
+def estimate_bundle_size(bundle):
+    """Rough in-memory size of a bundle: model weights, data frames and arrays"""
+    size = 0
+    for value in bundle.values():
+        if hasattr(value, 'count_params'):
+            size += value.count_params() * 4
+        elif hasattr(value, 'memory_usage'):
+            size += int(value.memory_usage(deep=True).sum())
+        elif isinstance(value, np.ndarray):
+            size += value.nbytes
+    return size
+
+
+class ModelRegistry:
+    """Process-wide cache of immutable model bundles.
+
+    Loading is single-flight: the first caller for a key runs the loader and
+    concurrent callers for the same key wait for its result. When a memory cap
+    is set, least recently used bundles are evicted to stay under it.
+    """
+
+    def __init__(self, loader, max_entries=None, max_bytes=None, sizeof=estimate_bundle_size):
+        self._loader = loader
+        self._max_entries = max_entries or None
+        self._max_bytes = max_bytes or None
+        self._sizeof = sizeof
+        self._bundles = OrderedDict()
+        self._sizes = {}
+        self._loading = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the bundle for `key`, loading it once if needed"""
+        with self._lock:
+            if key in self._bundles:
+                self._bundles.move_to_end(key)
+                return self._bundles[key]
+            future = self._loading.get(key)
+            owner = future is None
+            if owner:
+                future = self._loading[key] = Future()
+
+        if owner:
+            self._load(key, future)
+        return future.result()
+
+    def reload(self, key, prepare=None):
+        """Load a fresh bundle for `key` and swap it in atomically.
+
+        Requests already holding the old bundle keep using it. Listeners are
+        told about the replaced bundle so caches built on it can be dropped.
+        """
+        with self._lock:
+            if key in self._loading:
+                return None
+            future = self._loading[key] = Future()
+        self._load(key, future, prepare)
+        return future.result()
+
+    def _load(self, key, future, prepare=None):
+        try:
+            bundle = MappingProxyType(dict(self._loader(key)))
+            if prepare is not None:
+                prepare(bundle)
+            self._store(key, bundle)
+            future.set_result(bundle)
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+
+    def peek(self, key):
+        """Return the bundle for `key` if it is loaded, without loading or touching LRU order"""
+        with self._lock:
+            return self._bundles.get(key)
+
+    def keys(self):
+        with self._lock:
+            return list(self._bundles)
+
+    def add_listener(self, listener):
+        """Register listener(key, old_bundle) called when a bundle is evicted or replaced"""
+        self._listeners.append(listener)
+
+    def _store(self, key, bundle):
+        size = self._sizeof(bundle) if self._sizeof else 0
+        with self._lock:
+            old = self._bundles.pop(key, None)
+            self._bundles[key] = bundle
+            self._sizes[key] = size
+            removed = [(key, old)] if old is not None else []
+            removed += self._evict(keep=key)
+        for removed_key, removed_bundle in removed:
+            self._notify(removed_key, removed_bundle)
+
+    def _evict(self, keep):
+        evicted = []
+        while len(self._bundles) > 1 and (
+            (self._max_entries and len(self._bundles) > self._max_entries) or
+            (self._max_bytes and sum(self._sizes.values()) > self._max_bytes)
+        ):
+            key = next(k for k in self._bundles if k != keep)
+            evicted.append((key, self._bundles.pop(key)))
+            self._sizes.pop(key, None)
+        return evicted
+
+    def _notify(self, key, bundle):
+        for listener in self._listeners:
+            listener(key, bundle)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'loaded': list(self._bundles),
+                'estimated_bytes': sum(self._sizes.values()),
+                'max_entries': self._max_entries,
+                'max_bytes': self._max_bytes
+            }
+
+
+class ArtifactWatcher:
+    """Polls the on-disk version of every loaded bundle and reloads changed ones in the background.
+
+    Service modules create their watcher at import. After start_all() every
+    watcher runs, including ones created later, so a service's watcher starts
+    when that service is first imported instead of forcing the import at boot.
+    """
+
+    _instances = []
+    _autostart = False
+    _instances_lock = threading.Lock()
+
+    def __init__(self, registry, version_fn, interval, prepare=None):
+        self.registry = registry
+        self.version_fn = version_fn
+        self.interval = interval
+        self.prepare = prepare
+        self._thread = None
+        with ArtifactWatcher._instances_lock:
+            ArtifactWatcher._instances.append(self)
+            autostart = ArtifactWatcher._autostart
+        if autostart:
+            self.start()
+
+    @classmethod
+    def start_all(cls):
+        """Start every existing watcher now and every future one as soon as it is created"""
+        with cls._instances_lock:
+            cls._autostart = True
+            watchers = list(cls._instances)
+        for watcher in watchers:
+            watcher.start()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.check()
+
+    def check(self):
+        """Reload every loaded bundle whose artifacts changed since it was loaded"""
+        reloaded = []
+        for key in self.registry.keys():
+            bundle = self.registry.peek(key)
+            if bundle is None or self.version_fn(key) == bundle['version']:
+                continue
+            try:
+                self.registry.reload(key, self.prepare)
+                reloaded.append(key)
+            except Exception as e:
+                print(f"Reloading {key} failed, keeping the current version: {str(e)}")
+        return reloaded
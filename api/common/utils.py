@@ -0,0 +1,34 @@
+import hashlib
+import json
+import os
+from flask import Response, stream_with_context
+
+
+def artifact_version(*paths):
+    """Short fingerprint of model artifacts built from their size and modification time.
+
+    Loaders take it before reading the files, so a file replaced mid-load leaves a
+    stale version behind and the watcher reloads once more.
+    """
+    digest = hashlib.sha1()
+    for path in paths:
+        if os.path.exists(path):
+            stat = os.stat(path)
+            digest.update(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()[:12]
+
+
+def content_hash(*paths):
+    """Short digest of the bytes of every file, stable across copies and checkouts"""
+    digest = hashlib.sha1()
+    for path in paths:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def ndjson_response(records):
+    """Stream an iterable of dicts as newline-delimited JSON, one line per record as it is ready"""
+    lines = (json.dumps(record) + "\n" for record in records)
+    return Response(stream_with_context(lines), mimetype='application/x-ndjson')
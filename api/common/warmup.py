@@ -0,0 +1,31 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+preload_report = {}
+
+
+def _run_task(name, task):
+    start = time.perf_counter()
+    preload_report[name] = {'status': 'loading'}
+    try:
+        timings = task() or {}
+        preload_report[name] = {'status': 'ready', **timings}
+    except Exception as e:
+        preload_report[name] = {'status': 'failed', 'error': str(e)}
+    preload_report[name]['total_seconds'] = round(time.perf_counter() - start, 3)
+
+
+def preload_models(tasks, max_workers=4):
+    """Run (name, task) warm-up tasks in parallel and record per-model timings"""
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        for name, task in tasks:
+            executor.submit(_run_task, name, task)
+    return preload_report
+
+
+def preload_in_background(preload):
+    """Run `preload` on a daemon thread, /health shows its tasks as loading until they finish"""
+    thread = threading.Thread(target=preload, name='model-preload', daemon=True)
+    thread.start()
+    return thread
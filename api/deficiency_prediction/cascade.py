@@ -0,0 +1,81 @@
+# cascade.py
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from api.common.config import TFLITE_POOL_SIZE
+from api.common.utils import artifact_version
+
+CASCADE_MODES = ('sequential', 'concurrent', 'combined')
+
+class DeficiencyCascade:
+    """Pepper leaf gate followed by deficiency classification.
+
+    sequential: run the deficiency model only after the leaf gate passes.
+    concurrent: run both models at once and throw the deficiency result away
+                when the gate fails, latency is max(leaf, deficiency).
+    combined:   run one TFLite model with a leaf head and a deficiency head.
+    """
+    
+    def __init__(self, leaf_service, deficiency_service, threshold=0.8, mode='concurrent'):
+        if mode not in CASCADE_MODES:
+            raise ValueError(f"Cascade mode must be one of {', '.join(CASCADE_MODES)}")
+        self.leaf_service = leaf_service
+        self.deficiency_service = deficiency_service
+        self.threshold = threshold
+        self.mode = mode
+        self.executor = ThreadPoolExecutor(max_workers=max(1, TFLITE_POOL_SIZE))
+    
+    def warm_up(self):
+        """Load the interpreters this mode uses and run one dummy inference"""
+        if self.mode == 'combined':
+            pool = self.deficiency_service.load_combined_model()
+            pool.run(np.zeros(pool.input_details[0]['shape'], dtype=np.float32), all_outputs=True)
+        else:
+            self.leaf_service.warm_up()
+            self.deficiency_service.warm_up()
+    
+    def version(self):
+        """Fingerprint of the mode, threshold and model files behind a cascade result"""
+        if self.mode == 'combined':
+            paths = [self.deficiency_service.combined_model_path]
+        else:
+            paths = [self.leaf_service.model_path, self.deficiency_service.model_path]
+        return f"{self.mode}:{self.threshold}:{artifact_version(*paths)}"
+    
+    def is_pepper_leaf(self, leaf_type):
+        return leaf_type["predicted_class"] == "Pepper" and leaf_type["confidence"] >= self.threshold
+    
+    def run(self, img_array, age):
+        """Returns (leaf_type, deficiency result), the result is None when the leaf gate fails"""
+        return self.run_batch(img_array, age)[0]
+    
+    def run_batch(self, img_batch, age):
+        """Cascade over a stacked batch, returns one (leaf_type, result or None) per image"""
+        if self.mode == 'combined':
+            leaf_predictions, deficiency_predictions = self.deficiency_service.predict_combined(
+                img_batch, len(self.leaf_service.classes)
+            )
+        elif self.mode == 'concurrent':
+            deficiency_future = self.executor.submit(
+                self.deficiency_service.predict_probabilities, img_batch
+            )
+            leaf_predictions = self.leaf_service.predict_probabilities(img_batch)
+        else:
+            leaf_predictions = self.leaf_service.predict_probabilities(img_batch)
+        
+        leaf_types = [self.leaf_service.build_result(row[np.newaxis]) for row in leaf_predictions]
+        passed = [i for i, leaf_type in enumerate(leaf_types) if self.is_pepper_leaf(leaf_type)]
+        if not passed:
+            return [(leaf_type, None) for leaf_type in leaf_types]
+        
+        if self.mode == 'concurrent':
+            deficiency_predictions = deficiency_future.result()
+        elif self.mode == 'sequential':
+            gated = self.deficiency_service.predict_probabilities(img_batch[passed])
+            deficiency_predictions = dict(zip(passed, gated))
+        
+        deficiency_predictions_rows = set(passed)
+        return [
+            (leaf_type, self.deficiency_service.build_result(deficiency_predictions[i][np.newaxis], age)
+             if i in deficiency_predictions_rows else None)
+            for i, leaf_type in enumerate(leaf_types)
+        ]
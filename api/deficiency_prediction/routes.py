@@ -1,10 +1,59 @@
 # routes.py
+import threading
 from flask import Blueprint, request, jsonify
-from .services import DeficiencyPredictionService
-from .leaf_identification import LeafIdentificationService
+from api.common.images import predict_in_order
+from api.common.cache import prediction_cache, image_key
+from api.common.utils import ndjson_response
+from api.common.config import (
+    DEFICIENCY_CASCADE_MODE,
+    DEFICIENCY_LEAF_THRESHOLD,
+    BATCH_MAX_FILES,
+    BATCH_INFERENCE_SIZE
+)
 
 deficiency_bp = Blueprint('deficiency', __name__, url_prefix='/api/deficiency')
 
+# Process-wide cascade built by the first request, its interpreters are loaded once and reused
+_deficiency_cascade = None
+_deficiency_cascade_lock = threading.Lock()
+
+def get_deficiency_cascade():
+    """Shared leaf gate + deficiency cascade, created once per process on first use"""
+    global _deficiency_cascade
+    if _deficiency_cascade is None:
+        with _deficiency_cascade_lock:
+            if _deficiency_cascade is None:
+                from .services import DeficiencyPredictionService
+                from .leaf_identification import LeafIdentificationService
+                from .cascade import DeficiencyCascade
+                _deficiency_cascade = DeficiencyCascade(
+                    LeafIdentificationService(),
+                    DeficiencyPredictionService(),
+                    threshold=DEFICIENCY_LEAF_THRESHOLD,
+                    mode=DEFICIENCY_CASCADE_MODE
+                )
+    return _deficiency_cascade
+
+def parse_age(value):
+    """Validate the age form field, returns (age, error message)"""
+    if not value:
+        return None, 'Age parameter is required'
+    try:
+        age = int(value)
+    except ValueError:
+        return None, 'Age must be a valid number'
+    if age < 0:
+        return None, 'Age must be a positive number'
+    return age, None
+
+def leaf_gate_error(leaf_type):
+    return {
+        'status': 'error',
+        'message': 'Please upload a Pepper leaf image',
+        'detected_leaf': leaf_type["predicted_class"],
+        'confidence': float(leaf_type["confidence"])
+    }
+
 @deficiency_bp.route('/predict', methods=['POST'])
 def predict_deficiency():
     try:
@@ -19,35 +68,26 @@ def predict_deficiency():
             return jsonify({'error': 'No image selected'}), 400
 
         # Get age parameter
-        age = request.form.get('age')
-        if not age:
-            return jsonify({'error': 'Age parameter is required'}), 400
-
-        try:
-            age = int(age)
-            if age < 0:
-                return jsonify({'error': 'Age must be a positive number'}), 400
-        except ValueError:
-            return jsonify({'error': 'Age must be a valid number'}), 400
-
-        # Read image bytes
+        age, age_error = parse_age(request.form.get('age'))
+        if age_error:
+            return jsonify({'error': age_error}), 400
+
+        # Read image bytes, retries of the same photo and age are answered from the cache
         image_bytes = image_file.read()
+        deficiency_cascade = get_deficiency_cascade()
         
-        # First, verify it's a pepper leaf
-        leaf_service = LeafIdentificationService()
-        leaf_type = leaf_service.predict_leaf_type(image_bytes)
+        def run_cascade():
+            # Decode once for both models, verify it's a pepper leaf and get the deficiency prediction
+            img_array = deficiency_cascade.deficiency_service.prepare_image(image_bytes)
+            return deficiency_cascade.run(img_array, age)
         
-        if leaf_type["predicted_class"] != "Pepper" or leaf_type["confidence"] < 0.8:
-            return jsonify({
-                'status': 'error',
-                'message': 'Please upload a Pepper leaf image',
-                'detected_leaf': leaf_type["predicted_class"],
-                'confidence': float(leaf_type["confidence"])
-            }), 400
+        leaf_type, result = prediction_cache.get_or_compute(
+            image_key(image_bytes, 'deficiency', deficiency_cascade.version(), age),
+            run_cascade
+        )
         
-        # Get deficiency prediction
-        service = DeficiencyPredictionService()
-        result = service.predict_deficiency(image_bytes, age)
+        if result is None:
+            return jsonify(leaf_gate_error(leaf_type)), 400
         
         return jsonify({
             'status': 'success',
@@ -60,6 +100,53 @@ def predict_deficiency():
             'message': f'An error occurred during prediction: {str(e)}'
         }), 500
 
+@deficiency_bp.route('/predict-batch', methods=['POST'])
+def predict_deficiency_batch():
+    try:
+        image_files = [file for file in request.files.getlist('images') if file.filename != '']
+        if not image_files:
+            return jsonify({'error': 'No images provided'}), 400
+
+        if len(image_files) > BATCH_MAX_FILES:
+            return jsonify({'error': f'At most {BATCH_MAX_FILES} images per batch'}), 400
+
+        age, age_error = parse_age(request.form.get('age'))
+        if age_error:
+            return jsonify({'error': age_error}), 400
+
+        # Read every upload before streaming, decoding happens in parallel afterwards
+        filenames = [file.filename for file in image_files]
+        images = [file.read() for file in image_files]
+        deficiency_cascade = get_deficiency_cascade()
+
+        def stream_results():
+            outputs = predict_in_order(
+                images,
+                deficiency_cascade.deficiency_service.prepare_image,
+                lambda batch: deficiency_cascade.run_batch(batch, age),
+                BATCH_INFERENCE_SIZE
+            )
+            for index, output, error in outputs:
+                record = {'index': index, 'filename': filenames[index]}
+                if error is not None:
+                    record.update({
+                        'status': 'error',
+                        'message': f'An error occurred during prediction: {str(error)}'
+                    })
+                elif output[1] is None:
+                    record.update(leaf_gate_error(output[0]))
+                else:
+                    record.update({'status': 'success', 'data': output[1]})
+                yield record
+
+        return ndjson_response(stream_results())
+
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': f'An error occurred during prediction: {str(e)}'
+        }), 500
+
 @deficiency_bp.route('/health', methods=['GET'])
 def health_check():
     return jsonify({
@@ -1,45 +1,52 @@
 # services.py
-import tensorflow as tf
 import numpy as np
-from PIL import Image
-import io
 import os
+import threading
+from api.common.interpreters import InterpreterPool, resolve_model_variant
+from api.common.images import image_to_tensor
+from api.common.config import TFLITE_POOL_SIZE, TFLITE_NUM_THREADS, DEFICIENCY_COMBINED_MODEL
 
 class DeficiencyPredictionService:
     def __init__(self):
-        self.interpreter = None
+        self.pool = None
+        self.combined_pool = None
+        self._lock = threading.Lock()
         self.classes = ['Calcium', 'Heathly', 'Magnesium', 'Potasium']
-        self.model_path = 'models/DiseaseIdentificationTfLite.tflite'
+        self.model_path = resolve_model_variant('models/DiseaseIdentificationTfLite.tflite')
+        # Optional single model with a leaf identification head and a deficiency head
+        self.combined_model_path = resolve_model_variant(DEFICIENCY_COMBINED_MODEL)
         
     def load_model(self):
-        """Load the TFLite model if not already loaded"""
-        if self.interpreter is None:
-            if not os.path.exists(self.model_path):
-                raise FileNotFoundError(f"Model file not found at {self.model_path}")
-            self.interpreter = tf.lite.Interpreter(model_path=self.model_path)
-            self.interpreter.allocate_tensors()
-        return self.interpreter
+        """Load the TFLite interpreter pool if not already loaded"""
+        if self.pool is None:
+            with self._lock:
+                if self.pool is None:
+                    if not os.path.exists(self.model_path):
+                        raise FileNotFoundError(f"Model file not found at {self.model_path}")
+                    self.pool = InterpreterPool(self.model_path, TFLITE_POOL_SIZE, TFLITE_NUM_THREADS)
+        return self.pool
+    
+    def load_combined_model(self):
+        """Load the two-head leaf + deficiency TFLite model if not already loaded"""
+        if self.combined_pool is None:
+            with self._lock:
+                if self.combined_pool is None:
+                    if not os.path.exists(self.combined_model_path):
+                        raise FileNotFoundError(f"Combined model file not found at {self.combined_model_path}")
+                    self.combined_pool = InterpreterPool(
+                        self.combined_model_path, TFLITE_POOL_SIZE, TFLITE_NUM_THREADS
+                    )
+        return self.combined_pool
+    
+    def warm_up(self):
+        """Load the interpreters and run one dummy inference"""
+        pool = self.load_model()
+        pool.run(np.zeros(pool.input_details[0]['shape'], dtype=np.float32))
     
     def prepare_image(self, image_bytes):
         """Prepare image for prediction"""
         try:
-            # Open the image file using Pillow
-            img = Image.open(io.BytesIO(image_bytes))
-            
-            # Convert to RGB if necessary
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-            
-            # Resize the image to 64x64 (based on your model input size)
-            img = img.resize((64, 64))
-            
-            # Convert the image to a numpy array and normalize it
-            img_array = np.array(img) / 255.0  # normalize to 0-1 range
-            
-            # Expand dimensions to add batch size (1)
-            img_array = np.expand_dims(img_array, axis=0).astype(np.float32)
-            
-            return img_array
+            return image_to_tensor(image_bytes, (64, 64))
         except Exception as e:
             raise ValueError(f"Error processing image: {str(e)}")
     
@@ -233,49 +240,56 @@ class DeficiencyPredictionService:
         
         return fertilizer_recommendations.get(deficiency, {}).get(age_category, [])
     
-    def predict_deficiency(self, image_bytes, age):
+    def predict_probabilities(self, image):
+        """Run the deficiency model on image bytes or a prepared tensor"""
+        # Load model
+        pool = self.load_model()
+        
+        # Prepare image, unless the caller already decoded it
+        img_array = image if isinstance(image, np.ndarray) else self.prepare_image(image)
+        
+        # Run inference on a free interpreter
+        return pool.run(img_array)
+    
+    def predict_combined(self, img_array, leaf_class_count):
+        """Run the two-head model once, returns (leaf predictions, deficiency predictions)"""
+        outputs = self.load_combined_model().run(img_array, all_outputs=True)
+        heads = {output.shape[-1]: output for output in outputs}
+        if leaf_class_count not in heads or len(self.classes) not in heads:
+            raise ValueError("Combined model must expose a leaf head and a deficiency head")
+        return heads[leaf_class_count], heads[len(self.classes)]
+    
+    def build_result(self, predictions, age):
+        """Turn deficiency model output into the API result with fertilizer recommendations"""
+        # Get predicted class and confidence
+        predicted_class_idx = np.argmax(predictions, axis=1)[0]
+        deficiency = self.classes[predicted_class_idx]
+        confidence = float(np.max(predictions))
+        
+        # Prepare result
+        result = {
+            'predicted_class': deficiency,
+            'confidence': confidence,
+            'confidence_percentage': round(confidence * 100, 2)
+        }
+        
+        # Add fertilizer recommendations if deficiency is detected
+        if deficiency != "Heathly":
+            fertilizers = self.suggest_fertilizer(deficiency, age)
+            result['fertilizers'] = fertilizers
+            result['recommendation_count'] = len(fertilizers)
+        else:
+            result['message'] = 'Plant appears healthy. No fertilizer recommendations needed.'
+            result['fertilizers'] = []
+            result['recommendation_count'] = 0
+        
+        return result
+    
+    def predict_deficiency(self, image, age):
         """Main prediction function using TFLite model"""
         try:
-            # Load model
-            interpreter = self.load_model()
-            
-            # Get input and output details
-            input_details = interpreter.get_input_details()
-            output_details = interpreter.get_output_details()
-            
-            # Prepare image
-            img_array = self.prepare_image(image_bytes)
-            
-            # Set input tensor and run inference
-            interpreter.set_tensor(input_details[0]['index'], img_array)
-            interpreter.invoke()
-            
-            # Get predictions
-            predictions = interpreter.get_tensor(output_details[0]['index'])
-            
-            # Get predicted class and confidence
-            predicted_class_idx = np.argmax(predictions, axis=1)[0]
-            deficiency = self.classes[predicted_class_idx]
-            confidence = float(np.max(predictions))
-            
-            # Prepare result
-            result = {
-                'predicted_class': deficiency,
-                'confidence': confidence,
-                'confidence_percentage': round(confidence * 100, 2)
-            }
-            
-            # Add fertilizer recommendations if deficiency is detected
-            if deficiency != "Heathly":
-                fertilizers = self.suggest_fertilizer(deficiency, age)
-                result['fertilizers'] = fertilizers
-                result['recommendation_count'] = len(fertilizers)
-            else:
-                result['message'] = 'Plant appears healthy. No fertilizer recommendations needed.'
-                result['fertilizers'] = []
-                result['recommendation_count'] = 0
-            
-            return result
+            predictions = self.predict_probabilities(image)
+            return self.build_result(predictions, age)
             
         except Exception as e:
             raise Exception(f"Error during prediction: {str(e)}")
\ No newline at end of file
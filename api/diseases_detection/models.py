@@ -1,27 +1,44 @@
 import os
-import tensorflow as tf
-import gdown
 import numpy as np
-from PIL import Image
+from api.common.images import open_image
+from api.common.batching import MicroBatcher
+from api.common.interpreters import InterpreterPool, resolve_model_variant
+from api.common.utils import artifact_version
+from api.common.config import (
+    DISEASE_BATCH_MAX_SIZE,
+    DISEASE_BATCH_MAX_WAIT_MS,
+    TFLITE_POOL_SIZE,
+    TFLITE_NUM_THREADS
+)
+
+# Updated class labels - now 5 classes including Non-Pepper_Source
+CLASS_NAMES = [
+    'Healthy',
+    'Lace Bug Infection',
+    'Non-Pepper_Source',
+    'Vine borer Infection',
+    'Yellow Mottle Infection'
+]
 
 class DiseaseDetectionModel:
     def __init__(self):
         # Updated model path and Google Drive file ID
-        self.model_path = 'pickle_models/final_pepper_model.tflite'
+        # A quantized variant is used when TFLITE_MODEL_VARIANT names one that exists on disk
+        self.model_path = resolve_model_variant('pickle_models/final_pepper_model.tflite')
         self.file_id = '1GiKRe1BNswLLQ_yqrPehL1bqdTEaHRqs'
         self.download_url = f'https://drive.google.com/uc?id={self.file_id}'
-        self.interpreter = None
+        self.pool = None
+        self.version = None
         self.input_details = None
         self.output_details = None
+        self.batcher = MicroBatcher(
+            self.predict_batch,
+            max_batch_size=DISEASE_BATCH_MAX_SIZE,
+            max_wait_ms=DISEASE_BATCH_MAX_WAIT_MS,
+            workers=TFLITE_POOL_SIZE
+        )
         
-        # Updated class labels - now 5 classes including Non-Pepper_Source
-        self.class_names = [
-            'Healthy',
-            'Lace Bug Infection',
-            'Non-Pepper_Source',
-            'Vine borer Infection',
-            'Yellow Mottle Infection'
-        ]
+        self.class_names = CLASS_NAMES
         
         # Updated treatment recommendations
         self.treatments = {
@@ -38,47 +55,61 @@ class DiseaseDetectionModel:
         """Download model from Google Drive if not present"""
         os.makedirs('pickle_models', exist_ok=True)
         if not os.path.exists(self.model_path):
+            import gdown
             print("Downloading model from Google Drive...")
             gdown.download(self.download_url, self.model_path, quiet=False)
     
     def _load_model(self):
-        """Load the TFLite model"""
+        """Load the TFLite model into an interpreter pool"""
         self._download_model()
         
-        self.interpreter = tf.lite.Interpreter(model_path=self.model_path)
-        self.interpreter.allocate_tensors()
-        
-        self.input_details = self.interpreter.get_input_details()
-        self.output_details = self.interpreter.get_output_details()
+        self.version = artifact_version(self.model_path)
+        self.pool = InterpreterPool(self.model_path, TFLITE_POOL_SIZE, TFLITE_NUM_THREADS)
+        self.input_details = self.pool.input_details
+        self.output_details = self.pool.output_details
+    
+    def predict_batch(self, img_arrays):
+        """Run inference for several preprocessed images in a single invoke.
+
+        Batches are zero-padded to the batcher's max size, so every interpreter keeps
+        one input shape instead of reallocating its tensors whenever the size changes.
+        """
+        batch = np.concatenate(img_arrays, axis=0)
+        padding = self.batcher.max_batch_size - len(batch)
+        if padding > 0:
+            batch = np.concatenate([batch, np.zeros((padding,) + batch.shape[1:], dtype=batch.dtype)])
+        return list(self.pool.run(batch)[:len(img_arrays)])
     
-    def preprocess_image(self, image_path):
-        """Preprocess image for model input"""
-        img = Image.open(image_path).resize((244, 244)).convert('RGB')
+    def format_prediction(self, output_data):
+        confidence = float(np.max(output_data))
+        predicted_index = int(np.argmax(output_data))
+        predicted_label = self.class_names[predicted_index]
+
+        return {
+            'disease': predicted_label,
+            'confidence': round(confidence, 4),
+            'treatment': self.treatments.get(predicted_label, "No treatment recommendation available.")
+        }
+    
+    def preprocess_image(self, image):
+        """Preprocess image bytes, path or stream for model input"""
+        img = open_image(image, draft_size=(244, 244)).resize((244, 244)).convert('RGB')
         img_array = np.array(img).astype(np.float32) / 255.0
         img_array = np.expand_dims(img_array, axis=0)
         return img_array
     
-    def predict(self, image_path):
+    def predict(self, image):
         """Make prediction on image"""
         try:
             # Preprocess image
-            img_array = self.preprocess_image(image_path)
+            img_array = self.preprocess_image(image)
             
-            # Run inference
-            self.interpreter.set_tensor(self.input_details[0]['index'], img_array)
-            self.interpreter.invoke()
+            # Run inference, batched together with concurrent requests
+            output_data = self.batcher.submit(img_array)
             
-            # Get results
-            output_data = self.interpreter.get_tensor(self.output_details[0]['index'])
-            confidence = float(np.max(output_data))
-            predicted_index = int(np.argmax(output_data))
-            predicted_label = self.class_names[predicted_index]
-
-            return {
-                'disease': predicted_label,
-                'confidence': round(confidence, 4),
-                'treatment': self.treatments.get(predicted_label, "No treatment recommendation available.")
-            }
+            return self.format_prediction(output_data)
             
+        except ValueError:
+            raise
         except Exception as e:
             raise Exception(f'Failed to process image: {str(e)}')
\ No newline at end of file
@@ -1,16 +1,30 @@
+import threading
 from flask import Blueprint, request, jsonify
-from .services import DiseaseDetectionService
 from .schemas import DiseaseDetectionResponseSchema, ErrorResponseSchema
+from api.common.config import BATCH_MAX_FILES
+from api.common.utils import ndjson_response
 
 # Define the blueprint
 disease_bp = Blueprint('disease', __name__, url_prefix='/api/disease')
 
-# Initialize service & schemas
-disease_service = DiseaseDetectionService()
+# Initialize schemas; the service and its interpreters are built by the first request
+_disease_service = None
+_disease_service_lock = threading.Lock()
 disease_response_schema = DiseaseDetectionResponseSchema()
 error_response_schema = ErrorResponseSchema()
 
 
+def get_disease_service():
+    """Shared DiseaseDetectionService, created once per process on first use"""
+    global _disease_service
+    if _disease_service is None:
+        with _disease_service_lock:
+            if _disease_service is None:
+                from .services import DiseaseDetectionService
+                _disease_service = DiseaseDetectionService()
+    return _disease_service
+
+
 @disease_bp.route('/predict', methods=['POST'])
 def predict_disease():
     try:
@@ -21,7 +35,7 @@ def predict_disease():
         if file.filename == '':
             return jsonify({'error': 'No file selected'}), 400
 
-        result = disease_service.predict_disease(file)
+        result = get_disease_service().predict_disease(file)
         
         # Optional: Return 400 status if Non-Pepper_Source is detected
         if result.get('disease') == 'Non-Pepper_Source':
@@ -35,6 +49,22 @@ def predict_disease():
         return jsonify({'error': f'Failed to process image: {str(e)}'}), 500
 
 
+@disease_bp.route('/predict-batch', methods=['POST'])
+def predict_disease_batch():
+    try:
+        files = [file for file in request.files.getlist('files') if file.filename != '']
+        if not files:
+            return jsonify({'error': 'No files provided'}), 400
+        
+        if len(files) > BATCH_MAX_FILES:
+            return jsonify({'error': f'At most {BATCH_MAX_FILES} files per batch'}), 400
+
+        return ndjson_response(get_disease_service().predict_disease_batch(files))
+
+    except Exception as e:
+        return jsonify({'error': f'Failed to process images: {str(e)}'}), 500
+
+
 @disease_bp.route('/health', methods=['GET'])
 def health_check():
     return jsonify({
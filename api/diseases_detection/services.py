@@ -1,36 +1,57 @@
-import os
-from werkzeug.utils import secure_filename
 from .models import DiseaseDetectionModel
+from api.common.images import predict_in_order
+from api.common.cache import prediction_cache, image_key
+from api.common.config import BATCH_INFERENCE_SIZE
 
 class DiseaseDetectionService:
     def __init__(self):
         self.model = DiseaseDetectionModel()
-        self.upload_folder = 'uploads'
         self.allowed_extensions = {'png', 'jpg', 'jpeg', 'gif', 'bmp'}
-        
-        os.makedirs(self.upload_folder, exist_ok=True)
     
     def allowed_file(self, filename):
         return '.' in filename and \
                filename.rsplit('.', 1)[1].lower() in self.allowed_extensions
     
-    def save_uploaded_file(self, file):
+    def read_uploaded_file(self, file):
+        """Read the upload straight from the request stream into memory"""
         if file and self.allowed_file(file.filename):
-            filename = secure_filename(file.filename)
-            file_path = os.path.join(self.upload_folder, filename)
-            file.save(file_path)
-            return file_path
+            return file.read()
         else:
             raise ValueError("Invalid file type. Please upload an image file.")
     
     def predict_disease(self, file):
-        try:
-            file_path = self.save_uploaded_file(file)
-            result = self.model.predict(file_path)
-            if os.path.exists(file_path):
-                os.remove(file_path)
-            return result
-        except Exception as e:
-            if 'file_path' in locals() and os.path.exists(file_path):
-                os.remove(file_path)
-            raise e
\ No newline at end of file
+        image_bytes = self.read_uploaded_file(file)
+        # Retried uploads of the same photo are answered from the shared result cache
+        return prediction_cache.get_or_compute(
+            image_key(image_bytes, 'disease', self.model.version),
+            lambda: self.model.predict(image_bytes)
+        )
+    
+    def predict_disease_batch(self, files):
+        """Read every upload now and return a generator of per-image results in upload order"""
+        uploads = []
+        for file in files:
+            try:
+                uploads.append(self.read_uploaded_file(file))
+            except ValueError as e:
+                uploads.append(e)
+        filenames = [file.filename for file in files]
+        return self._stream_batch(uploads, filenames)
+    
+    def _stream_batch(self, uploads, filenames):
+        predictions = predict_in_order(
+            uploads,
+            self.model.preprocess_image,
+            lambda batch: self.model.pool.run(batch),
+            BATCH_INFERENCE_SIZE
+        )
+        # Same record shape as the deficiency batch endpoint
+        for index, output, error in predictions:
+            record = {'index': index, 'filename': filenames[index]}
+            if isinstance(error, ValueError):
+                record.update({'status': 'error', 'message': str(error)})
+            elif error is not None:
+                record.update({'status': 'error', 'message': f'Failed to process image: {str(error)}'})
+            else:
+                record.update({'status': 'success', 'data': self.model.format_prediction(output)})
+            yield record
@@ -1,7 +1,12 @@
 from flask import Blueprint, request, jsonify
 from marshmallow import ValidationError
-from .services import predict_district_price
-from .schemas import DistrictPredictionRequestSchema, DistrictPredictionResponseSchema
+from api.common.errors import InvalidInputError
+from .schemas import (
+    DistrictPredictionRequestSchema,
+    DistrictPredictionResponseSchema,
+    DistrictBatchPredictionRequestSchema,
+    DistrictBatchPredictionResponseSchema
+)
 
 district_bp = Blueprint('district', __name__, url_prefix='/district')
 
@@ -9,6 +14,8 @@ district_bp = Blueprint('district', __name__, url_prefix='/district')
 def predict():
     """District prediction endpoint"""
     try:
+        from .services import predict_district_price
+        
         request_data = request.get_json()
         validated_data = DistrictPredictionRequestSchema().load(request_data)
         
@@ -20,6 +27,28 @@ def predict():
         return DistrictPredictionResponseSchema().dump(result)
     except ValidationError as err:
         return jsonify({"error": err.messages}), 400
+    except InvalidInputError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@district_bp.route("/predict-all", methods=["POST"])
+def predict_all():
+    """Whole-island district prediction endpoint"""
+    try:
+        from .services import predict_all_districts
+        
+        request_data = request.get_json()
+        validated_data = DistrictBatchPredictionRequestSchema().load(request_data)
+        
+        result = predict_all_districts(
+            target_date=validated_data["target_date"],
+            districts=validated_data["districts"]
+        )
+        
+        return DistrictBatchPredictionResponseSchema().dump(result)
+    except ValidationError as err:
+        return jsonify({"error": err.messages}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
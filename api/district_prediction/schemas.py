@@ -1,12 +1,30 @@
-from marshmallow import Schema, fields
+from marshmallow import Schema, fields, ValidationError
+
+def validate_target_date(value):
+    """Reject dates pandas cannot parse, so they fail with a 400 before any model is touched"""
+    import pandas as pd
+
+    try:
+        pd.to_datetime(value)
+    except (ValueError, TypeError, OverflowError):
+        raise ValidationError(f"Not a valid date: {value}")
 
 class DistrictPredictionRequestSchema(Schema):
     district = fields.Str(required=True)
-    target_date = fields.Str(required=True)
+    target_date = fields.Str(required=True, validate=validate_target_date)
 
 class DistrictPredictionResponseSchema(Schema):
     district = fields.Str()
     target_date = fields.Str()
     predicted_price = fields.Float()
     model_accuracy = fields.Float()
-    model_type = fields.Str()
\ No newline at end of file
+    model_type = fields.Str()
+
+class DistrictBatchPredictionRequestSchema(Schema):
+    target_date = fields.Str(required=True, validate=validate_target_date)
+    districts = fields.List(fields.Str(), load_default=None)
+
+class DistrictBatchPredictionResponseSchema(Schema):
+    target_date = fields.Str()
+    predictions = fields.List(fields.Nested(DistrictPredictionResponseSchema))
+    errors = fields.Dict(keys=fields.Str(), values=fields.Str())
\ No newline at end of file
@@ -1,4 +1,5 @@
 import os
+import time
 import pickle
 import pandas as pd
 import numpy as np
@@ -6,19 +7,33 @@ from pathlib import Path
 from datetime import datetime
 from tensorflow.keras.models import load_model
 from sklearn.exceptions import InconsistentVersionWarning
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from api.common.forecasting import (
+    ForecastEngine,
+    StackedForecastEngine,
+    architecture_signature,
+    bundle_version,
+    stack_layout,
+    trace_bundle
+)
+from api.common.registry import ModelRegistry, ArtifactWatcher
+from api.common.errors import InvalidInputError
+from api.common.config import MODEL_CACHE_MAX_ENTRIES, MODEL_CACHE_MAX_BYTES, MODEL_RELOAD_INTERVAL
 import warnings
 
 warnings.filterwarnings("ignore", category=InconsistentVersionWarning)
 
-loaded_district_models = {}
-district_latest_data = {}
+stacked_engines = {}
+stacked_engines_lock = threading.Lock()
 
 def get_district_model(district):
-    """Get cached district model or load it"""
-    if district not in loaded_district_models:
-        model = load_district_model(district)
-        loaded_district_models[district] = model
-    return loaded_district_models[district]
+    """Get cached district model bundle or load it"""
+    return district_registry.get(district)
+
+def model_version(district):
+    """Fingerprint of the model, components and latest data files on disk"""
+    return bundle_version(Path(__file__).parent / "district_models" / district)
 
 def load_district_model(district):
     """Load district model components from pickle files"""
@@ -29,54 +44,74 @@ def load_district_model(district):
         raise FileNotFoundError(f"No model directory found for {district}")
     
     try:
+        version = model_version(district)
         with open(model_dir / "model_components.pkl", "rb") as f:
             components = pickle.load(f)
         
         model = load_model(model_dir / "lstm_model.h5")
         
         data_path = model_dir / "latest_data.csv"
-        if data_path.exists():
-            data = pd.read_csv(data_path)
-            data['Date'] = pd.to_datetime(data['Date'])
-            district_latest_data[district] = data
+        data = _read_latest_data(data_path) if data_path.exists() else None
         
-        return {
+        bundle = {
             "model": model,
+            "data": data,
+            "engine": ForecastEngine(model),
+            "signature": architecture_signature(model),
+            "stack": stack_layout(model),
+            "version": version,
             "scaler": components['scaler'],
             "params": components['params'],
             "accuracy": components['accuracy'],
             "model_type": "LSTM"
         }
+        if data is not None:
+            # Fixed for the life of the bundle, so predictions skip the pandas and scaler work
+            bundle["last_date"] = data['Date'].max()
+            bundle["window"] = _last_sequence(bundle, data)
+        return bundle
     except Exception as e:
         raise RuntimeError(f"Error loading {district} model: {str(e)}")
 
+def _read_latest_data(data_path):
+    data = pd.read_csv(data_path)
+    data['Date'] = pd.to_datetime(data['Date'])
+    return data
+
+district_registry = ModelRegistry(
+    load_district_model,
+    max_entries=MODEL_CACHE_MAX_ENTRIES,
+    max_bytes=MODEL_CACHE_MAX_BYTES
+)
+
+def _last_sequence(model_info, type_data):
+    """Scaled input window ending at the last observed month"""
+    seq_length = model_info['params']['seq_length']
+    window = type_data['GR-1 - Price'].to_numpy()[-seq_length:].reshape(-1, 1)
+    return model_info['scaler'].transform(window).reshape(1, seq_length, 1)
+
+def _forecast_steps(model_info, target_date):
+    """Number of months between the last observed month and the target date"""
+    last_date = model_info['last_date']
+    if target_date <= last_date:
+        raise InvalidInputError(f"Date must be after {last_date.strftime('%Y-%m-%d')}")
+    steps = (target_date.year - last_date.year) * 12 + (target_date.month - last_date.month)
+    if steps < 1:
+        raise InvalidInputError(f"Date must be in a later month than {last_date.strftime('%Y-%m')}")
+    return steps
+
 def predict_district_price(district, target_date):
     """Make district price prediction for GR-1 pepper"""
     try:
         model_info = get_district_model(district)
         target_date = pd.to_datetime(target_date)
-        
-        if district not in district_latest_data:
+        if model_info['data'] is None:
             raise ValueError(f"No data available for {district}")
             
-        type_data = district_latest_data[district]
-        last_date = type_data['Date'].max()
-        
-        if target_date <= last_date:
-            raise ValueError(f"Date must be after {last_date.strftime('%Y-%m-%d')}")
-        
-        steps = (target_date.year - last_date.year) * 12 + (target_date.month - last_date.month)
+        steps = _forecast_steps(model_info, target_date)
 
         scaler = model_info['scaler']
-        seq_length = model_info['params']['seq_length']
-        scaled_data = scaler.transform(type_data[['GR-1 - Price']].values)
-        last_sequence = scaled_data[-seq_length:].reshape(1, seq_length, 1)
-        
-        current_sequence = last_sequence.copy()
-        for _ in range(steps):
-            next_pred = model_info['model'].predict(current_sequence, verbose=0)
-            current_sequence = np.roll(current_sequence, -1, axis=1)
-            current_sequence[0, -1, 0] = next_pred[0,0]
+        next_pred = model_info['engine'].rollout(model_info['window'], steps)[:, -1:]
         
         predicted_price = float(scaler.inverse_transform(next_pred)[0,0])
         
@@ -88,9 +123,125 @@ def predict_district_price(district, target_date):
             "model_type": model_info['model_type']
         }
         
+    except InvalidInputError:
+        raise
     except Exception as e:
         raise RuntimeError(f"District prediction failed: {str(e)}")
 
+def _group_key(model_info):
+    """Districts with the same architecture are stacked into one batch, whatever their window length"""
+    return model_info['signature']
+
+def _get_stacked_engine(plan, window_length):
+    """One batched engine per layer plan and padded window length, whatever the districts behind it"""
+    key = (plan, window_length)
+    with stacked_engines_lock:
+        engine = stacked_engines.get(key)
+        if engine is None:
+            engine = stacked_engines[key] = StackedForecastEngine(plan, window_length)
+    return engine
+
+def _predict_group(districts, model_infos, target_date):
+    """Roll a group of same-shaped district models forward together"""
+    steps = [_forecast_steps(info, target_date) for info in model_infos]
+    sequences = [info['window'] for info in model_infos]
+    stacks = [info['stack'] for info in model_infos]
+    
+    if len(districts) == 1 or any(stack is None for stack in stacks):
+        trajectories = np.concatenate([
+            info['engine'].rollout(sequence, max(steps)) for info, sequence in zip(model_infos, sequences)
+        ])
+    else:
+        # Only the requested districts' weights are stacked, so no rows are wasted
+        engine = _get_stacked_engine(stacks[0][0], max(sequence.shape[1] for sequence in sequences))
+        weights = [np.stack(arrays) for arrays in zip(*(weights for _, weights in stacks))]
+        trajectories = engine.rollout(sequences, max(steps), weights)
+    
+    results = []
+    for i, (district, info) in enumerate(zip(districts, model_infos)):
+        scaled_price = trajectories[i, steps[i] - 1]
+        predicted_price = float(info['scaler'].inverse_transform([[scaled_price]])[0, 0])
+        results.append({
+            "district": district,
+            "target_date": target_date.strftime("%Y-%m-%d"),
+            "predicted_price": round(predicted_price, 2),
+            "model_accuracy": round(info['accuracy'], 2),
+            "model_type": info['model_type']
+        })
+    return results
+
+def _predict_members(members, target_date):
+    """Predictions for one group of (district, bundle) pairs, a failure is reported for each member"""
+    try:
+        return _predict_group([district for district, _ in members], [info for _, info in members], target_date), {}
+    except Exception as e:
+        return [], {district: f"District prediction failed: {str(e)}" for district, _ in members}
+
+def predict_all_districts(target_date, districts=None):
+    """Predict GR-1 prices for many districts, batching districts that share a model shape"""
+    target_date = pd.to_datetime(target_date)
+    districts = districts or sorted(get_available_districts())
+    
+    groups = {}
+    errors = {}
+    for district in districts:
+        try:
+            model_info = get_district_model(district)
+            if model_info['data'] is None:
+                raise ValueError(f"No data available for {district}")
+            _forecast_steps(model_info, target_date)
+        except Exception as e:
+            errors[district] = str(e)
+            continue
+        groups.setdefault(_group_key(model_info), []).append((district, model_info))
+    
+    # A lone group runs inline, spinning up a thread for it costs more than it overlaps
+    if len(groups) > 1:
+        with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+            outcomes = list(executor.map(lambda members: _predict_members(members, target_date), groups.values()))
+    else:
+        outcomes = [_predict_members(members, target_date) for members in groups.values()]
+    
+    predictions = []
+    for group_predictions, group_errors in outcomes:
+        predictions.extend(group_predictions)
+        errors.update(group_errors)
+    
+    order = {district: i for i, district in enumerate(districts)}
+    predictions.sort(key=lambda item: order[item['district']])
+    
+    return {
+        "target_date": target_date.strftime("%Y-%m-%d"),
+        "predictions": predictions,
+        "errors": errors
+    }
+
+reload_watcher = ArtifactWatcher(district_registry, model_version, MODEL_RELOAD_INTERVAL, prepare=trace_bundle)
+
+def warm_up_model(district):
+    """Load a district model and trace its rollout graph with one dummy inference"""
+    start = time.perf_counter()
+    model_info = get_district_model(district)
+    loaded = time.perf_counter()
+    
+    trace_bundle(model_info)
+    
+    return {
+        'load_seconds': round(loaded - start, 3),
+        'warmup_seconds': round(time.perf_counter() - loaded, 3)
+    }
+
+def warm_up_batch():
+    """Trace the stacked engines behind predict_all_districts for every loaded district"""
+    start = time.perf_counter()
+    bundles = {d: district_registry.peek(d) for d in district_registry.keys()}
+    districts = sorted(d for d, bundle in bundles.items() if bundle is not None and bundle['data'] is not None)
+    if districts:
+        last_date = max(bundles[d]['last_date'] for d in districts)
+        predict_all_districts(last_date + pd.DateOffset(months=1), districts)
+    
+    return {'warmup_seconds': round(time.perf_counter() - start, 3)}
+
 def get_available_districts():
     """List all available districts with models"""
     current_dir = Path(__file__).parent
@@ -103,19 +254,19 @@ def get_available_districts():
 
 def get_district_history(district):
     """Get historical price data for a district"""
-    if district not in district_latest_data:
+    bundle = district_registry.peek(district)
+    data = bundle['data'] if bundle is not None else None
+    if data is None:
         try:
             current_dir = Path(__file__).parent
             data_path = current_dir / "district_models" / district / "latest_data.csv"
             if data_path.exists():
-                data = pd.read_csv(data_path)
-                data['Date'] = pd.to_datetime(data['Date'])
-                district_latest_data[district] = data
+                data = _read_latest_data(data_path)
             else:
                 raise FileNotFoundError(f"No data file found for {district}")
         except Exception as e:
             raise ValueError(f"Could not load history for {district}: {str(e)}")
     
-    history = district_latest_data[district][['Date', 'GR-1 - Price']].copy()
+    history = data[['Date', 'GR-1 - Price']].copy()
     history.columns = ['date', 'price']
     return history.to_dict('records')
\ No newline at end of file
@@ -1,16 +1,92 @@
 from catboost import CatBoostRegressor
 import os
+import json
+import tempfile
+import numpy as np
+
+# Above this many rows CatBoost's own multi-threaded evaluator is faster than the compiled trees
+COMPILED_MAX_ROWS = 16
+
+
+class CompiledTrees:
+    """Oblivious trees from CatBoost's JSON export flattened into NumPy lookup tables.
+
+    Every distinct (feature, border) split is evaluated once per row, each tree's
+    leaf index is built from its split bits and all leaf values are gathered in
+    one indexing operation, which avoids CatBoost's per-call overhead on tiny inputs.
+    """
+
+    def __init__(self, model):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            export_path = os.path.join(tmp_dir, 'model.json')
+            model.save_model(export_path, format='json')
+            with open(export_path) as f:
+                exported = json.load(f)
+
+        trees = exported.get('oblivious_trees')
+        if not trees:
+            raise ValueError("Only symmetric (oblivious) tree models can be compiled")
+        scale, bias = exported.get('scale_and_bias', [1.0, [0.0]])
+        if len(bias) != 1:
+            raise ValueError("Only single-output models can be compiled")
+
+        splits = {}
+        for tree in trees:
+            for split in tree['splits']:
+                if split['split_type'] != 'FloatFeature':
+                    raise ValueError(f"Unsupported split type {split['split_type']}")
+                splits.setdefault((split['float_feature_index'], split['border']), len(splits))
+
+        depth = max(len(tree['splits']) for tree in trees)
+        # Padded levels point at an always-false split, so shallower trees keep their leaf index
+        split_ids = np.full((len(trees), depth), len(splits), dtype=np.intp)
+        leaf_values = np.zeros((len(trees), 2 ** depth))
+        for i, tree in enumerate(trees):
+            for level, split in enumerate(tree['splits']):
+                split_ids[i, level] = splits[(split['float_feature_index'], split['border'])]
+            leaf_values[i, :len(tree['leaf_values'])] = tree['leaf_values']
+
+        self.border_features = np.array([feature for feature, _ in splits], dtype=np.intp)
+        self.borders = np.array([border for _, border in splits], dtype=np.float32)
+        self.split_ids = split_ids
+        self.level_weights = 1 << np.arange(depth, dtype=np.intp)
+        self.leaf_values = leaf_values.ravel()
+        self.leaf_offsets = np.arange(len(trees), dtype=np.intp) * 2 ** depth
+        self.scale = float(scale)
+        self.bias = float(bias[0])
+
+    def predict(self, features):
+        """Score a (rows, features) array, matching CatBoostRegressor.predict"""
+        # CatBoost compares float32 feature values against float32 borders
+        features = np.asarray(features, dtype=np.float32)
+        bits = np.zeros((len(features), len(self.borders) + 1), dtype=np.intp)
+        bits[:, :-1] = features[:, self.border_features] > self.borders
+        leaves = bits[:, self.split_ids] @ self.level_weights
+        return self.leaf_values[leaves + self.leaf_offsets].sum(axis=1) * self.scale + self.bias
+
 
 class PricePredictionModel:
     def __init__(self):
         self.model = None
+        self.compiled = None
         self.columns_order = [
             'Rainfall', 'Inflation_Rate', 'Is_Seasonal', 'Is_Non_Seasonal',
             'Type_GR-1', 'Type_GR-2', 'Type_White'
         ]
-    
-    def load_model(self, model_path):
-        """Load the trained CatBoost model"""
+
+    def load_model(self, model_path, compiled=False):
+        """Load the trained CatBoost model, optionally compiling its trees for small inputs"""
         self.model = CatBoostRegressor()
         self.model.load_model(model_path)
-        return self
\ No newline at end of file
+        if compiled:
+            try:
+                self.compiled = CompiledTrees(self.model)
+            except Exception as e:
+                print(f"Compiled scoring unavailable, using CatBoost predict: {str(e)}")
+        return self
+
+    def predict(self, features):
+        """Score a float array whose columns follow `columns_order`"""
+        if self.compiled is not None and len(features) <= COMPILED_MAX_ROWS:
+            return self.compiled.predict(features)
+        return self.model.predict(features)
@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify
-from .services import PricePredictionService
-import os
+from api.common.config import NEW_PRICE_BATCH_MAX_ROWS
+from api.common.utils import ndjson_response
 
 new_price_bp = Blueprint('new_price', __name__, url_prefix='/api/new-price')
 
@@ -8,13 +8,10 @@ new_price_bp = Blueprint('new_price', __name__, url_prefix='/api/new-price')
 def predict():
     """Price prediction endpoint"""
     try:
-        input_data = request.get_json()
+        from .services import get_service
         
-        model_path = os.path.join(
-            os.path.dirname(__file__),
-            '..', '..', 'pickle_models', 'price_predictor.cbm'
-        )
-        service = PricePredictionService(model_path)
+        input_data = request.get_json()
+        service = get_service()
         
         prediction = service.validate_and_predict(input_data)
         
@@ -29,6 +26,46 @@ def predict():
             'status': 'error'
         }), 400
 
+@new_price_bp.route('/predict-batch', methods=['POST'])
+def predict_batch():
+    """Score a JSON array of inputs in one call, streamed as NDJSON in input order"""
+    try:
+        from .services import get_service
+        
+        inputs = request.get_json()
+        if isinstance(inputs, list) and len(inputs) > NEW_PRICE_BATCH_MAX_ROWS:
+            raise ValueError(f"At most {NEW_PRICE_BATCH_MAX_ROWS} inputs per batch")
+        
+        predictions = get_service().predict_batch(inputs)
+        
+        return ndjson_response(
+            {'index': index, 'predicted_price': prediction, 'status': 'success'}
+            for index, prediction in enumerate(predictions)
+        )
+        
+    except Exception as e:
+        return jsonify({
+            'error': str(e),
+            'status': 'error'
+        }), 400
+
+@new_price_bp.route('/grid', methods=['POST'])
+def predict_grid():
+    """Price surface over rainfall x inflation x seasonality x grade, streamed as NDJSON"""
+    try:
+        from .services import get_service
+        
+        service = get_service()
+        axes = service.grid_axes(request.get_json())
+        
+        return ndjson_response(service.predict_grid(axes))
+        
+    except Exception as e:
+        return jsonify({
+            'error': str(e),
+            'status': 'error'
+        }), 400
+
 @new_price_bp.route('/health')
 def health_check():
     return jsonify({"status": "healthy"})
\ No newline at end of file
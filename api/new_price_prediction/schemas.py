@@ -19,4 +19,36 @@ class PricePredictionInputSchema(Schema):
             raise ValidationError("Rainfall must be positive", field_name="rainfall")
         
         if abs(data.get('inflation_rate')) > 100:
-            raise ValidationError("Inflation rate seems unrealistic", field_name="inflation_rate")
\ No newline at end of file
+            raise ValidationError("Inflation rate seems unrealistic", field_name="inflation_rate")
+
+class ValueRangeSchema(Schema):
+    """Either an explicit list of `values` or an inclusive start/stop/step range"""
+    values = fields.List(fields.Float(), validate=validate.Length(min=1))
+    start = fields.Float()
+    stop = fields.Float()
+    step = fields.Float(validate=validate.Range(min=0, min_inclusive=False))
+
+    @validates_schema
+    def validate_range(self, data, **kwargs):
+        if 'values' in data:
+            return
+        missing = [name for name in ('start', 'stop', 'step') if name not in data]
+        if missing:
+            raise ValidationError(f"Provide values or start, stop and step (missing {', '.join(missing)})")
+        if data['stop'] < data['start']:
+            raise ValidationError("stop must not be smaller than start", field_name="stop")
+
+
+class PriceGridInputSchema(Schema):
+    rainfall = fields.Nested(ValueRangeSchema, required=True)
+    inflation_rate = fields.Nested(ValueRangeSchema, required=True)
+    price_type = fields.List(
+        fields.String(validate=validate.OneOf(['GR1', 'GR2', 'WHITE'])),
+        load_default=['GR1', 'GR2', 'WHITE'],
+        validate=validate.Length(min=1)
+    )
+    seasonality = fields.List(
+        fields.String(validate=validate.OneOf(['YES', 'NO'])),
+        load_default=['YES', 'NO'],
+        validate=validate.Length(min=1)
+    )
\ No newline at end of file
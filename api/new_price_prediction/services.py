@@ -1,11 +1,44 @@
-import pandas as pd
+import os
+import itertools
+import numpy as np
+from marshmallow import ValidationError
 from .models import PricePredictionModel
-from .schemas import PricePredictionInputSchema
+from .schemas import PricePredictionInputSchema, PriceGridInputSchema
+from api.common.registry import ModelRegistry, ArtifactWatcher
+from api.common.utils import artifact_version
+from api.common.config import (
+    MODEL_RELOAD_INTERVAL,
+    CATBOOST_COMPILED_SCORING,
+    NEW_PRICE_GRID_MAX_POINTS
+)
+
+MODEL_PATH = os.path.normpath(os.path.join(
+    os.path.dirname(__file__),
+    '..', '..', 'pickle_models', 'price_predictor.cbm'
+))
+
+GRID_AXES = ['rainfall', 'price_type', 'inflation_rate', 'seasonality']
+
+def _axis_length(axis):
+    if 'values' in axis:
+        return len(axis['values'])
+    steps = np.floor((axis['stop'] - axis['start']) / axis['step'] + 1e-9)
+    if not np.isfinite(steps):
+        # A step like 1e-320 overflows the division, which is just a grid over the cap
+        raise ValueError(f"Grid has too many points, the limit is {NEW_PRICE_GRID_MAX_POINTS}")
+    return int(steps) + 1
+
+def _axis_values(axis):
+    """Explicit values, or every step from start up to and including stop"""
+    if 'values' in axis:
+        return [float(value) for value in axis['values']]
+    return [round(axis['start'] + i * axis['step'], 10) for i in range(_axis_length(axis))]
 
 class PricePredictionService:
-    def __init__(self, model_path):
-        self.model = PricePredictionModel().load_model(model_path)
+    def __init__(self, model_path, compiled=CATBOOST_COMPILED_SCORING):
+        self.model = PricePredictionModel().load_model(model_path, compiled)
         self.schema = PricePredictionInputSchema()
+        self.grid_schema = PriceGridInputSchema()
     
     def validate_and_predict(self, input_data):
         """Validate input and make prediction"""
@@ -13,10 +46,64 @@ class PricePredictionService:
         if errors:
             raise ValueError(errors)
         
-        processed_data = self._preprocess_input(input_data)
-        input_df = pd.DataFrame([processed_data])[self.model.columns_order]
+        features = self._to_features([input_data])
+        
+        return float(self.model.predict(features)[0])
+    
+    def predict_batch(self, inputs):
+        """Validate every input in one pass and score them with a single predict call"""
+        if not isinstance(inputs, list) or not inputs:
+            raise ValueError("Expected a non-empty list of inputs")
+        
+        errors = self.schema.validate(inputs, many=True)
+        if errors:
+            raise ValueError(errors)
+        
+        return [float(price) for price in self.model.predict(self._to_features(inputs))]
+    
+    def grid_axes(self, grid_spec):
+        """Validate a grid request and expand each axis, refusing grids above the point cap"""
+        try:
+            grid_spec = self.grid_schema.load(grid_spec)
+        except ValidationError as e:
+            raise ValueError(e.messages)
+        
+        points = 1
+        for name in GRID_AXES:
+            axis = grid_spec[name]
+            points *= _axis_length(axis) if isinstance(axis, dict) else len(axis)
+        if points > NEW_PRICE_GRID_MAX_POINTS:
+            raise ValueError(f"Grid has {points} points, the limit is {NEW_PRICE_GRID_MAX_POINTS}")
         
-        return float(self.model.model.predict(input_df)[0])
+        axes = {
+            'rainfall': _axis_values(grid_spec['rainfall']),
+            'price_type': list(dict.fromkeys(grid_spec['price_type'])),
+            'inflation_rate': _axis_values(grid_spec['inflation_rate']),
+            'seasonality': list(dict.fromkeys(grid_spec['seasonality']))
+        }
+        if min(axes['rainfall']) < 0:
+            raise ValueError({'rainfall': ["Rainfall must be positive"]})
+        if max(abs(value) for value in axes['inflation_rate']) > 100:
+            raise ValueError({'inflation_rate': ["Inflation rate seems unrealistic"]})
+        return axes
+    
+    def predict_grid(self, axes):
+        """Score the Cartesian product of the axes in one predict call, yielding one record per point"""
+        points = [
+            dict(zip(GRID_AXES, combination))
+            for combination in itertools.product(*(axes[name] for name in GRID_AXES))
+        ]
+        predictions = self.model.predict(self._to_features(points))
+        return (
+            {**point, 'predicted_price': float(price)}
+            for point, price in zip(points, predictions)
+        )
+    
+    def _to_features(self, inputs):
+        """Build a float array in the model's column order, skipping the DataFrame"""
+        columns = self.model.columns_order
+        rows = [self._preprocess_input(input_data) for input_data in inputs]
+        return np.array([[row[column] for column in columns] for row in rows], dtype=np.float64)
     
     def _preprocess_input(self, input_data):
         """Convert input data to model-ready format"""
@@ -31,4 +118,32 @@ class PricePredictionService:
             'Type_GR-1': 1 if price_type == 'GR1' else 0,
             'Type_GR-2': 1 if price_type == 'GR2' else 0,
             'Type_White': 1 if price_type == 'WHITE' else 0
-        }
\ No newline at end of file
+        }
+
+def load_service(model_path):
+    """Parse the CatBoost model once and wrap it in a ready-to-use service"""
+    try:
+        version = artifact_version(model_path)
+        return {
+            'service': PricePredictionService(model_path),
+            'version': version
+        }
+    except Exception as e:
+        raise RuntimeError(f"Error loading price model {model_path}: {str(e)}")
+
+service_registry = ModelRegistry(load_service)
+
+reload_watcher = ArtifactWatcher(service_registry, artifact_version, MODEL_RELOAD_INTERVAL)
+
+def get_service(model_path=MODEL_PATH):
+    """Process-wide service for `model_path`, loaded on first use and swapped when the .cbm changes"""
+    return service_registry.get(model_path)['service']
+
+def warm_up_model():
+    """Load the CatBoost model and run one prediction so the first request is not slower"""
+    get_service().validate_and_predict({
+        'rainfall': 0.0,
+        'price_type': 'GR1',
+        'inflation_rate': 0.0,
+        'seasonality': 'YES'
+    })
@@ -1,4 +1,11 @@
 from .routes import pepper_bp
-from .services import PepperRecommendationService, ClimateDataFetcher
 
-__all__ = ['pepper_bp', 'PepperRecommendationService', 'ClimateDataFetcher']
\ No newline at end of file
+__all__ = ['pepper_bp', 'PepperRecommendationService', 'ClimateDataFetcher']
+
+
+def __getattr__(name):
+    # The services load pandas and scikit-learn, so they are only imported when asked for
+    if name in ('PepperRecommendationService', 'ClimateDataFetcher'):
+        from . import services
+        return getattr(services, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
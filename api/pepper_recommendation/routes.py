@@ -1,71 +1,123 @@
 # api/pepper_recommendation/routes.py
-from flask import Blueprint, request, jsonify
-from .services import predict_pepper, get_climate_data, get_soil_data, get_soil_and_pepper_data
+from flask import Blueprint, Response, request, jsonify
+from api.common.config import PEPPER_CATALOG_MAX_AGE, PEPPER_BATCH_MAX_ROWS
 
 pepper_bp = Blueprint('pepper', __name__, url_prefix='/api/pepper')
 
+SUGGEST_FIELDS = [
+    'elevation', 'annual_rainfall', 'avg_temperature',
+    'humidity', 'soil_texture', 'soil_quality', 'drainage'
+]
+
+def parse_suggest_input(data):
+    """Validate one suggest-pepper input, returning (input_parameters, error)"""
+    missing_fields = [field for field in SUGGEST_FIELDS if field not in data or data[field] is None]
+    if missing_fields:
+        return None, f'Missing required fields: {", ".join(missing_fields)}'
+
+    try:
+        elevation = float(data['elevation'])
+        annual_rainfall = float(data['annual_rainfall'])
+        avg_temperature = float(data['avg_temperature'])
+        humidity = float(data['humidity'])
+    except (ValueError, TypeError):
+        return None, 'Invalid numerical values. Elevation, annual_rainfall, avg_temperature, and humidity must be numbers.'
+
+    if not (0 <= humidity <= 100):
+        return None, 'Humidity must be between 0 and 100'
+    
+    if elevation < 0:
+        return None, 'Elevation cannot be negative'
+    
+    if annual_rainfall < 0:
+        return None, 'Annual rainfall cannot be negative'
+
+    return {
+        'elevation': elevation,
+        'annual_rainfall': annual_rainfall,
+        'avg_temperature': avg_temperature,
+        'humidity': humidity,
+        'soil_texture': data['soil_texture'],
+        'soil_quality': data['soil_quality'],
+        'drainage': data['drainage']
+    }, None
+
+def category_error(row):
+    """Error message for a categorical input the model was never trained on, or None"""
+    from .services import unknown_category
+
+    unknown = unknown_category(row)
+    if unknown is None:
+        return None
+    position, known = unknown
+    return f"Unknown {SUGGEST_FIELDS[position]} '{row[position]}', expected one of: {', '.join(known)}"
+
 @pepper_bp.route('/suggest-pepper', methods=['POST'])
 def suggest_pepper():
     try:
+        from .services import predict_pepper
+
         data = request.get_json()
         if not data:
             return jsonify({'error': 'No JSON data received'}), 400
 
-        elevation = data.get('elevation')
-        annual_rainfall = data.get('annual_rainfall')
-        avg_temperature = data.get('avg_temperature')
-        humidity = data.get('humidity')
-        soil_texture = data.get('soil_texture')
-        soil_quality = data.get('soil_quality')
-        drainage = data.get('drainage')
-
-        required_fields = [
-            'elevation', 'annual_rainfall', 'avg_temperature', 
-            'humidity', 'soil_texture', 'soil_quality', 'drainage'
-        ]
-        
-        missing_fields = [field for field in required_fields if field not in data or data[field] is None]
-        if missing_fields:
-            return jsonify({
-                'error': f'Missing required fields: {", ".join(missing_fields)}'
-            }), 400
+        input_parameters, error = parse_suggest_input(data)
+        if error:
+            return jsonify({'error': error}), 400
 
-        try:
-            elevation = float(elevation)
-            annual_rainfall = float(annual_rainfall)
-            avg_temperature = float(avg_temperature)
-            humidity = float(humidity)
-        except (ValueError, TypeError):
-            return jsonify({
-                'error': 'Invalid numerical values. Elevation, annual_rainfall, avg_temperature, and humidity must be numbers.'
-            }), 400
+        row = [input_parameters[field] for field in SUGGEST_FIELDS]
+        error = category_error(row)
+        if error:
+            return jsonify({'error': error}), 400
 
-        if not (0 <= humidity <= 100):
-            return jsonify({'error': 'Humidity must be between 0 and 100'}), 400
-        
-        if elevation < 0:
-            return jsonify({'error': 'Elevation cannot be negative'}), 400
+        variety = predict_pepper(*row)
+
+        return jsonify({
+            'success': True,
+            'predicted_variety': variety,
+            'input_parameters': input_parameters
+        }), 200
+
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Internal server error: {str(e)}'
+        }), 500
+
+@pepper_bp.route('/suggest-pepper-batch', methods=['POST'])
+def suggest_pepper_batch():
+    """Score a JSON array of suggest-pepper inputs with one model call"""
+    try:
+        from .services import predict_pepper_batch
+
+        data = request.get_json()
+        if not isinstance(data, list) or not data:
+            return jsonify({'error': 'Expected a non-empty JSON array of inputs'}), 400
         
-        if annual_rainfall < 0:
-            return jsonify({'error': 'Annual rainfall cannot be negative'}), 400
+        if len(data) > PEPPER_BATCH_MAX_ROWS:
+            return jsonify({'error': f'At most {PEPPER_BATCH_MAX_ROWS} inputs per batch'}), 400
 
-        variety = predict_pepper(
-            elevation, annual_rainfall, avg_temperature, humidity, 
-            soil_texture, soil_quality, drainage
-        )
+        inputs = []
+        rows = []
+        for index, item in enumerate(data):
+            input_parameters, error = parse_suggest_input(item if isinstance(item, dict) else {})
+            if error:
+                return jsonify({'error': error, 'index': index}), 400
+            row = [input_parameters[field] for field in SUGGEST_FIELDS]
+            error = category_error(row)
+            if error:
+                return jsonify({'error': error, 'index': index}), 400
+            inputs.append(input_parameters)
+            rows.append(row)
+
+        varieties = predict_pepper_batch(rows)
 
         return jsonify({
             'success': True,
-            'predicted_variety': variety,
-            'input_parameters': {
-                'elevation': elevation,
-                'annual_rainfall': annual_rainfall,
-                'avg_temperature': avg_temperature,
-                'humidity': humidity,
-                'soil_texture': soil_texture,
-                'soil_quality': soil_quality,
-                'drainage': drainage
-            }
+            'predictions': [
+                {'predicted_variety': variety, 'input_parameters': input_parameters}
+                for variety, input_parameters in zip(varieties, inputs)
+            ]
         }), 200
 
     except Exception as e:
@@ -77,6 +129,8 @@ def suggest_pepper():
 @pepper_bp.route('/get-climate-data', methods=['POST'])
 def climate_data():
     try:
+        from .services import get_climate_data
+
         data = request.get_json()
         if not data:
             return jsonify({'error': 'No JSON data received'}), 400
@@ -119,6 +173,8 @@ def climate_data():
 @pepper_bp.route('/get-soil-data', methods=['POST'])
 def soil_data():
     try:
+        from .services import get_soil_data
+
         data = request.get_json()
         if not data:
             return jsonify({'error': 'No JSON data received'}), 400
@@ -155,6 +211,8 @@ def soil_data():
 @pepper_bp.route('/get-soil-and-pepper-data', methods=['POST'])
 def soil_and_pepper_data():
     try:
+        from .services import get_soil_and_pepper_data
+
         data = request.get_json()
         if not data:
             return jsonify({'error': 'No JSON data received'}), 400
@@ -194,6 +252,26 @@ def soil_and_pepper_data():
             'error': f'Internal server error: {str(e)}'
         }), 500
 
+@pepper_bp.route('/catalog', methods=['GET'])
+def catalog():
+    """Districts, DS divisions and soil types, revalidated by ETag so unchanged data returns 304"""
+    try:
+        from .services import get_catalog
+        
+        body, etag = get_catalog()
+        
+        response = Response(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = PEPPER_CATALOG_MAX_AGE
+        return response.make_conditional(request)
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': f'Internal server error: {str(e)}'
+        }), 500
+
 @pepper_bp.route('/varieties', methods=['GET'])
 def get_varieties():
     try:
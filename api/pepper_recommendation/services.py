@@ -1,17 +1,41 @@
 # api/pepper_recommendation/services.py
 import os
+import json
+import hashlib
+import tempfile
+import threading
+import numpy as np
 import pandas as pd
 import joblib
 import warnings
+from api.common.utils import content_hash
+from api.common.config import PEPPER_RECOMMENDATION_MAP
 
 warnings.filterwarnings("ignore", category=UserWarning, module="sklearn")
 
+def _normalize(value):
+    return str(value).strip().lower()
+
+def _pick_column(df, *names):
+    """First of `names` present in the dataset, so both CSV layouts are supported"""
+    for name in names:
+        if name in df.columns:
+            return name
+    return None
+
 class ClimateDataFetcher:
-    _df = None
+    # Normalized lookup tables built once from the CSV, which is not kept in memory
+    _data_path = None
+    _climate_index = None
+    _soil_index = None
+    _soil_names = None
+    _variety_index = None
+    _catalog_body = None
+    _catalog_etag = None
     
     @classmethod
     def _load_data(cls):
-        if cls._df is None:
+        if cls._climate_index is None:
             possible_paths = [
                 'data/dataset_corrected.csv',  # Updated dataset
                 'data/With_climate_data.csv',  # Fallback to original dataset
@@ -31,89 +55,131 @@ class ClimateDataFetcher:
                 raise FileNotFoundError(f"CSV file not found in any of these locations: {possible_paths}")
             
             try:
-                cls._df = pd.read_csv(file_path)
+                df = pd.read_csv(file_path)
             except Exception as e:
                 raise FileNotFoundError(f"Error loading CSV file from '{file_path}': {str(e)}")
+            
+            cls._data_path = file_path
+            cls._build_indexes(df)
+    
+    @classmethod
+    def _build_indexes(cls, df):
+        """Hash the climate, soil and variety lookups by normalized keys, keeping the first matching row"""
+        # Use updated column names from dataset_corrected.csv, falling back to With_climate_data.csv
+        elevation = _pick_column(df, 'Elevation', 'Elevation (m)')
+        rainfall = _pick_column(df, 'Rainfall', 'Annual Rainfall (mm)')
+        temperature = _pick_column(df, 'Temp', 'Avg Temperature (?C)')
+        humidity = _pick_column(df, 'Humidity', 'Humidity (%)')
+        soil_texture = _pick_column(df, 'Soil Texture', 'Soil Texture Type')
+        drainage = _pick_column(df, 'Soil Drainage', 'Drainage')
+        variety = _pick_column(df, 'Best Variety')
+        
+        climate_index = {}
+        soil_index = {}
+        variety_index = {}
+        districts = {}
+        ds_divisions = {}
+        soil_types = {}
+        for row in df.to_dict('records'):
+            district = _normalize(row['District'])
+            ds_division = _normalize(row['DS Division'])
+            soil = _normalize(row[soil_texture])
+            
+            districts.setdefault(district, str(row['District']).strip())
+            ds_divisions.setdefault(district, {}).setdefault(ds_division, str(row['DS Division']).strip())
+            soil_types.setdefault(soil, str(row[soil_texture]).strip())
+            
+            if (district, ds_division) not in climate_index:
+                climate_index[(district, ds_division)] = {
+                    'Elevation (m)': int(row[elevation]),
+                    'Annual Rainfall (mm)': int(row[rainfall]),
+                    'Avg Temperature (°C)': float(row[temperature]),
+                    'Humidity (%)': int(row[humidity])
+                }
+            
+            if soil not in soil_index:
+                soil_index[soil] = {
+                    'Soil Quality': row['Soil Quality'],
+                    'Drainage': row[drainage]
+                }
+            
+            if variety is not None and (ds_division, soil) not in variety_index:
+                variety_index[(ds_division, soil)] = {
+                    'Recommended pepper type': row[variety]
+                }
+        
+        catalog = {
+            'success': True,
+            'districts': sorted(districts.values()),
+            'ds_divisions': {
+                districts[district]: sorted(divisions.values())
+                for district, divisions in sorted(ds_divisions.items(), key=lambda item: districts[item[0]])
+            },
+            'soil_types': sorted(soil_types.values())
+        }
+        catalog_body = json.dumps(catalog, ensure_ascii=False).encode('utf-8')
+        
+        cls._catalog_body = catalog_body
+        cls._catalog_etag = hashlib.sha1(catalog_body).hexdigest()
+        cls._soil_index = soil_index
+        cls._soil_names = soil_types
+        cls._variety_index = variety_index
+        cls._climate_index = climate_index
     
     @classmethod
     def get_climate_data(cls, district, ds_division):
         cls._load_data()
-        result = cls._df[
-            (cls._df['District'].str.strip().str.lower() == district.strip().lower()) &
-            (cls._df['DS Division'].str.strip().str.lower() == ds_division.strip().lower())
-        ]
-
-        if result.empty:
-            return None
-
-        try:
-            # Use updated column names from dataset_corrected.csv
-            elevation = int(result['Elevation'].values[0])
-            rainfall = int(result['Rainfall'].values[0])
-            temperature = float(result['Temp'].values[0])
-            humidity = int(result['Humidity'].values[0])
-        except KeyError:
-            # Fallback to original column names if using With_climate_data.csv
-            elevation = int(result['Elevation (m)'].values[0])
-            rainfall = int(result['Annual Rainfall (mm)'].values[0])
-            temperature = float(result['Avg Temperature (?C)'].values[0])
-            humidity = int(result['Humidity (%)'].values[0])
-
-        return {
-            'Elevation (m)': elevation,
-            'Annual Rainfall (mm)': rainfall,
-            'Avg Temperature (°C)': temperature,
-            'Humidity (%)': humidity
-        }
+        record = cls._climate_index.get((_normalize(district), _normalize(ds_division)))
+        return dict(record) if record is not None else None
 
     @classmethod
     def get_soil_data(cls, soil_type):
         cls._load_data()
-        result = cls._df[
-            (cls._df['Soil Texture'].str.strip().str.lower() == soil_type.strip().lower())
-        ]
-
-        if result.empty:
-            return None
-
-        try:
-            # Use updated column names
-            soil_quality = result['Soil Quality'].values[0]
-            drainage = result['Soil Drainage'].values[0]
-        except KeyError:
-            # Fallback to original column names
-            soil_quality = result['Soil Quality'].values[0]
-            drainage = result['Drainage'].values[0]
-
-        return {
-            'Soil Quality': soil_quality,
-            'Drainage': drainage
-        }
+        record = cls._soil_index.get(_normalize(soil_type))
+        return dict(record) if record is not None else None
 
     @classmethod
     def get_soil_and_pepper_data(cls, soil_type, ds_division):
         cls._load_data()
-        result = cls._df[
-            (cls._df['DS Division'].str.strip().str.lower() == ds_division.strip().lower()) &
-            (cls._df['Soil Texture'].str.strip().str.lower() == soil_type.strip().lower())
-        ]
-
-        if result.empty:
-            return None
+        record = cls._variety_index.get((_normalize(ds_division), _normalize(soil_type)))
+        return dict(record) if record is not None else None
 
-        try:
-            soil_type = result['Best Variety'].values[0]
-        except KeyError:
-            return None
-
-        return {
-            'Recommended pepper type': soil_type
-        }
+    @classmethod
+    def known_feature_rows(cls):
+        """Model inputs for every (district, DS division) climate record paired with every soil texture"""
+        cls._load_data()
+        rows = {}
+        for climate in cls._climate_index.values():
+            for soil, soil_name in cls._soil_names.items():
+                soil_record = cls._soil_index[soil]
+                rows[(
+                    float(climate['Elevation (m)']),
+                    float(climate['Annual Rainfall (mm)']),
+                    float(climate['Avg Temperature (°C)']),
+                    float(climate['Humidity (%)']),
+                    soil_name,
+                    soil_record['Soil Quality'],
+                    soil_record['Drainage']
+                )] = None
+        return list(rows)
+    
+    @classmethod
+    def get_catalog(cls):
+        """Serialized districts, DS divisions per district and soil types, with their ETag"""
+        cls._load_data()
+        return cls._catalog_body, cls._catalog_etag
 
 class PepperRecommendationService:
     _model = None
+    _model_path = None
+    _encoder_path = None
     _label_encoders = None
+    _encodings = None
     _categorical_features = ['Soil Texture Type', 'Soil Quality', 'Drainage']
+    _feature_columns = [
+        'Elevation (m)', 'Annual Rainfall (mm)', 'Avg Temperature (?C)', 'Humidity (%)',
+        'Soil Texture Type', 'Soil Quality', 'Drainage'
+    ]
     
     @classmethod
     def _load_models(cls):
@@ -148,44 +214,161 @@ class PepperRecommendationService:
             if encoder_path is None:
                 raise FileNotFoundError(f"Label encoders file 'label_encoders.joblib' not found in any of these locations: {possible_encoder_paths}")
             
-            cls._model = joblib.load(model_path)
+            # Encodings first, so a concurrent caller never sees the model without them
+            cls._model_path = model_path
+            cls._encoder_path = encoder_path
             cls._label_encoders = joblib.load(encoder_path)
+            cls._build_encodings()
+            cls._model = joblib.load(model_path)
     
     @classmethod
-    def predict_pepper(cls, elevation, annual_rainfall, avg_temperature, humidity, 
-                      soil_texture, soil_quality, drainage):
+    def _build_encodings(cls):
+        """Class-to-code tables equivalent to each fitted LabelEncoder.transform"""
+        cls._encodings = {
+            column: {value: code for code, value in enumerate(encoder.classes_)}
+            for column, encoder in cls._label_encoders.items()
+            if hasattr(encoder, 'classes_') and len(encoder.classes_) > 0
+        }
+    
+    @classmethod
+    def _encode(cls, column, values):
+        if column not in cls._label_encoders:
+            raise ValueError(f"Label encoder not found for column: {column}")
+        if column not in cls._encodings:
+            cls._label_encoders[column].fit(list(values))
+            cls._build_encodings()
+        
+        table = cls._encodings[column]
+        try:
+            return np.fromiter((table[value] for value in values), dtype=np.int64, count=len(values))
+        except KeyError as e:
+            raise ValueError(f"Value '{e.args[0]}' not found in the fitted label encoder for column: {column}")
+    
+    @classmethod
+    def can_encode(cls, row):
+        """Whether every categorical value of a feature row was seen by its label encoder"""
+        cls._load_models()
+        return all(
+            value in cls._encodings.get(column, ())
+            for column, value in zip(cls._feature_columns, row)
+            if column in cls._categorical_features
+        )
+    
+    @classmethod
+    def unknown_category(cls, row):
+        """(position, known values) of the first categorical value its fitted encoder never saw, or None"""
+        cls._load_models()
+        for position, (column, value) in enumerate(zip(cls._feature_columns, row)):
+            table = cls._encodings.get(column)
+            if column in cls._categorical_features and table is not None and value not in table:
+                return position, sorted(table)
+        return None
+    
+    @classmethod
+    def predict_pepper_batch(cls, rows):
+        """Score (elevation, rainfall, temperature, humidity, soil texture, soil quality, drainage) rows in one predict"""
         cls._load_models()
         
+        columns = list(zip(*rows))
         new_data = pd.DataFrame({
-            'Elevation (m)': [elevation],
-            'Annual Rainfall (mm)': [annual_rainfall],
-            'Avg Temperature (?C)': [avg_temperature],
-            'Humidity (%)': [humidity],
-            'Soil Texture Type': [soil_texture],
-            'Soil Quality': [soil_quality],
-            'Drainage': [drainage]
-        })
-
-        for column in cls._categorical_features:
-            if column in new_data.columns and column in cls._label_encoders:
-                try:
-                    if not hasattr(cls._label_encoders[column], 'classes_') or len(cls._label_encoders[column].classes_) == 0:
-                        cls._label_encoders[column].fit(new_data[column])
-                    new_data[column] = cls._label_encoders[column].transform(new_data[column])
-                except ValueError as e:
-                    raise ValueError(f"Value '{new_data[column].iloc[0]}' not found in the fitted label encoder for column: {column}")
-            elif column in new_data.columns:
-                raise ValueError(f"Label encoder not found for column: {column}")
-
-        prediction = cls._model.predict(new_data)
-        return prediction[0]
+            name: cls._encode(name, values) if name in cls._categorical_features else np.asarray(values, dtype=np.float64)
+            for name, values in zip(cls._feature_columns, columns)
+        }, columns=cls._feature_columns)
+
+        return cls._model.predict(new_data).tolist()
+    
+    @classmethod
+    def predict_pepper(cls, elevation, annual_rainfall, avg_temperature, humidity, 
+                      soil_texture, soil_quality, drainage):
+        return cls.predict_pepper_batch([(
+            elevation, annual_rainfall, avg_temperature, humidity,
+            soil_texture, soil_quality, drainage
+        )])[0]
+
+class RecommendationTable:
+    """Variety for every known location and soil texture, keyed by the exact model input row.
+
+    The table is persisted with hashes of the model, encoders and dataset and is
+    rebuilt when any of them changes. Inputs outside it use live inference.
+    """
+    _table = None
+    _lock = threading.Lock()
+    
+    @classmethod
+    def _hashes(cls):
+        ClimateDataFetcher._load_data()
+        PepperRecommendationService._load_models()
+        return {
+            'model_hash': content_hash(PepperRecommendationService._model_path, PepperRecommendationService._encoder_path),
+            'dataset_hash': content_hash(ClimateDataFetcher._data_path)
+        }
+    
+    @classmethod
+    def build(cls, path=PEPPER_RECOMMENDATION_MAP, hashes=None):
+        """Score every known combination in one predict call and save the table to `path`"""
+        hashes = hashes or cls._hashes()
+        # Soil values the encoders never saw cannot be scored, live inference reports them as before
+        rows = [row for row in ClimateDataFetcher.known_feature_rows() if PepperRecommendationService.can_encode(row)]
+        table = dict(zip(rows, PepperRecommendationService.predict_pepper_batch(rows))) if rows else {}
+        
+        # Written next to the target and renamed over it, so readers never see a partial file
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                joblib.dump({**hashes, 'table': table}, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Could not save recommendation map to {path}: {str(e)}")
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        return table
+    
+    @classmethod
+    def load(cls, path=PEPPER_RECOMMENDATION_MAP):
+        """Load the persisted table if its hashes still match, otherwise rebuild it"""
+        if cls._table is None:
+            with cls._lock:
+                if cls._table is None:
+                    hashes = cls._hashes()
+                    stored = None
+                    if os.path.exists(path):
+                        try:
+                            stored = joblib.load(path)
+                        except Exception as e:
+                            print(f"Ignoring unreadable recommendation map {path}: {str(e)}")
+                    
+                    if stored is not None and all(stored.get(key) == value for key, value in hashes.items()):
+                        cls._table = stored['table']
+                    else:
+                        cls._table = cls.build(path, hashes)
+        return cls._table
+    
+    @classmethod
+    def lookup(cls, row):
+        return cls.load().get(tuple(row))
 
 def predict_pepper(elevation, annual_rainfall, avg_temperature, humidity, 
                   soil_texture, soil_quality, drainage):
-    return PepperRecommendationService.predict_pepper(
-        elevation, annual_rainfall, avg_temperature, humidity, 
-        soil_texture, soil_quality, drainage
-    )
+    row = (elevation, annual_rainfall, avg_temperature, humidity, soil_texture, soil_quality, drainage)
+    variety = RecommendationTable.lookup(row)
+    if variety is not None:
+        return variety
+    return PepperRecommendationService.predict_pepper(*row)
+
+def predict_pepper_batch(rows):
+    """Serve known combinations from the recommendation table and score the rest in one call"""
+    table = RecommendationTable.load()
+    varieties = [table.get(tuple(row)) for row in rows]
+    misses = [index for index, variety in enumerate(varieties) if variety is None]
+    if misses:
+        predicted = PepperRecommendationService.predict_pepper_batch([rows[index] for index in misses])
+        for index, variety in zip(misses, predicted):
+            varieties[index] = variety
+    return varieties
+
+def unknown_category(row):
+    return PepperRecommendationService.unknown_category(row)
 
 def get_climate_data(district, ds_division):
     return ClimateDataFetcher.get_climate_data(district, ds_division)
@@ -194,4 +377,12 @@ def get_soil_data(soil_type):
     return ClimateDataFetcher.get_soil_data(soil_type)
 
 def get_soil_and_pepper_data(soil_type, ds_division):
-    return ClimateDataFetcher.get_soil_and_pepper_data(soil_type, ds_division)
\ No newline at end of file
+    return ClimateDataFetcher.get_soil_and_pepper_data(soil_type, ds_division)
+
+def get_catalog():
+    return ClimateDataFetcher.get_catalog()
+
+if __name__ == '__main__':
+    # Offline build: python -m api.pepper_recommendation.services
+    table = RecommendationTable.build()
+    print(f"Saved {len(table)} recommendations to {PEPPER_RECOMMENDATION_MAP}")
@@ -1,13 +1,15 @@
 from flask import Blueprint, request, jsonify
 from flask import send_from_directory
-from .services import predict_price
 from .schemas import (
     PredictionRequestSchema,
     PredictionResponseSchema,
+    ForecastRequestSchema,
+    ForecastResponseSchema,
     HistoryResponseSchema,
     ModelsResponseSchema
 )
 from marshmallow import ValidationError
+from api.common.errors import InvalidInputError
 
 price_bp = Blueprint('price', __name__, url_prefix='/price')
 
@@ -15,6 +17,8 @@ price_bp = Blueprint('price', __name__, url_prefix='/price')
 def predict():
     """Prediction endpoint"""
     try:
+        from .services import predict_price
+        
         request_data = request.get_json()
         validated_data = PredictionRequestSchema().load(request_data)
         
@@ -26,10 +30,26 @@ def predict():
         return PredictionResponseSchema().dump(result)
     except ValidationError as err:
         return jsonify({"error": err.messages}), 400
+    except InvalidInputError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-
+@price_bp.route("/forecast/<pepper_type>", methods=["GET"])
+def forecast(pepper_type):
+    """Monthly forecast path endpoint"""
+    try:
+        from .services import forecast_price_path
+        
+        validated_data = ForecastRequestSchema().load(request.args)
+        
+        result = forecast_price_path(pepper_type, validated_data["months"])
+        
+        return ForecastResponseSchema().dump(result)
+    except ValidationError as err:
+        return jsonify({"error": err.messages}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
 @price_bp.route("/", methods=["GET"])
 def price_ui():
@@ -1,4 +1,4 @@
-from marshmallow import Schema, fields
+from marshmallow import Schema, fields, validate
 
 class PredictionRequestSchema(Schema):
     pepper_type = fields.Str(required=True)
@@ -14,6 +14,16 @@ class HistoryItemSchema(Schema):
     date = fields.Str()
     price = fields.Float()
 
+class ForecastRequestSchema(Schema):
+    months = fields.Int(required=True, validate=validate.Range(min=1, max=120))
+
+class ForecastResponseSchema(Schema):
+    pepper_type = fields.Str()
+    last_date = fields.Str()
+    months = fields.Int()
+    model_accuracy = fields.Float()
+    forecast = fields.List(fields.Nested(HistoryItemSchema))
+
 class HistoryResponseSchema(Schema):
     pepper_type = fields.Str()
     history = fields.List(fields.Nested(HistoryItemSchema))
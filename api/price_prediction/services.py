@@ -1,17 +1,24 @@
 import os
+import time
 import pickle
 import pandas as pd
-import numpy as np
 from pathlib import Path
 from datetime import datetime
 from tensorflow.keras.models import load_model
 from sklearn.exceptions import InconsistentVersionWarning
+from api.common.forecasting import ForecastEngine, ForecastCache, bundle_version, trace_bundle
+from api.common.registry import ModelRegistry, ArtifactWatcher
+from api.common.errors import InvalidInputError
+from api.common.config import MODEL_CACHE_MAX_ENTRIES, MODEL_CACHE_MAX_BYTES, MODEL_RELOAD_INTERVAL
 import warnings
 
 warnings.filterwarnings("ignore", category=InconsistentVersionWarning)
 
-loaded_models = {}
-latest_data = {}
+forecast_cache = ForecastCache()
+
+def model_version(pepper_type):
+    """Fingerprint of the model, components and latest data files on disk"""
+    return bundle_version(Path(__file__).parent / "pickle_models" / pepper_type)
 
 def load_model_pickle(pepper_type):
     """Load model components from pickle files"""
@@ -22,19 +29,23 @@ def load_model_pickle(pepper_type):
         raise FileNotFoundError(f"No model directory found for {pepper_type}")
     
     try:
+        version = model_version(pepper_type)
         with open(model_dir / "model_components.pkl", "rb") as f:
             components = pickle.load(f)
         
         model = load_model(model_dir / "lstm_model.h5")
     
+        data = None
         data_path = model_dir / "latest_data.csv"
         if data_path.exists():
             data = pd.read_csv(data_path)
             data['Date'] = pd.to_datetime(data['Date'])
-            latest_data[pepper_type] = data
         
         return {
             'model': model,
+            'data': data,
+            'engine': ForecastEngine(model),
+            'version': version,
             'scaler': components['scaler'],
             'params': components['params'],
             'accuracy': components['accuracy']
@@ -42,42 +53,108 @@ def load_model_pickle(pepper_type):
     except Exception as e:
         raise RuntimeError(f"Error loading {pepper_type} model: {str(e)}")
 
+model_registry = ModelRegistry(
+    load_model_pickle,
+    max_entries=MODEL_CACHE_MAX_ENTRIES,
+    max_bytes=MODEL_CACHE_MAX_BYTES
+)
+model_registry.add_listener(lambda pepper_type, bundle: forecast_cache.invalidate(pepper_type))
+
 def get_model(pepper_type):
-    """Get cached model or load it"""
-    if pepper_type not in loaded_models:
-        model = load_model_pickle(pepper_type)
-        loaded_models[pepper_type] = model
-    return loaded_models[pepper_type]
+    """Get cached model bundle or load it"""
+    return model_registry.get(pepper_type)
+
+def get_available_pepper_types():
+    """List all pepper types with models"""
+    models_dir = Path(__file__).parent / "pickle_models"
+    
+    if not models_dir.exists():
+        return []
+    
+    return [d.name for d in models_dir.iterdir() if d.is_dir()]
+
+reload_watcher = ArtifactWatcher(model_registry, model_version, MODEL_RELOAD_INTERVAL, prepare=trace_bundle)
+
+def warm_up_model(pepper_type):
+    """Load a model and trace its rollout graph with one dummy inference"""
+    start = time.perf_counter()
+    model_info = get_model(pepper_type)
+    loaded = time.perf_counter()
+    
+    trace_bundle(model_info)
+    
+    return {
+        'load_seconds': round(loaded - start, 3),
+        'warmup_seconds': round(time.perf_counter() - loaded, 3)
+    }
+
+def forecast_trajectory(model_info, type_data, steps):
+    """Forecast every month up to `steps` in a single rollout and return unscaled prices"""
+    scaler = model_info['scaler']
+    seq_length = model_info['params']['seq_length']
+    scaled_data = scaler.transform(type_data[['National_Price']].values)
+    last_sequence = scaled_data[-seq_length:].reshape(1, seq_length, 1)
+    
+    scaled_path = model_info['engine'].rollout(last_sequence, steps)
+    return scaler.inverse_transform(scaled_path.reshape(-1, 1))[:, 0]
+
+def forecast_path(pepper_type, model_info, type_data, steps):
+    """Cached trajectory keyed on pepper type, last data date and model version"""
+    key = (pepper_type, type_data['Date'].max(), model_info['version'])
+    return forecast_cache.get_path(
+        key, steps, lambda n: forecast_trajectory(model_info, type_data, n)
+    )
+
+def forecast_price_path(pepper_type, months):
+    """Forecast the monthly price path for the next `months` months"""
+    try:
+        model_info = get_model(pepper_type)
+        type_data = model_info['data']
+        
+        if type_data is None:
+            raise ValueError(f"No data available for {pepper_type}")
+        
+        last_date = type_data['Date'].max()
+        path = forecast_path(pepper_type, model_info, type_data, months)
+        
+        return {
+            "pepper_type": pepper_type,
+            "last_date": last_date.strftime("%Y-%m-%d"),
+            "months": months,
+            "model_accuracy": round(model_info['accuracy'], 2),
+            "forecast": [
+                {
+                    "date": (last_date + pd.DateOffset(months=i + 1)).strftime("%Y-%m-%d"),
+                    "price": round(float(price), 2)
+                }
+                for i, price in enumerate(path)
+            ]
+        }
+        
+    except Exception as e:
+        raise RuntimeError(f"Forecast failed: {str(e)}")
 
 def predict_price(pepper_type, target_date):
     """Make price prediction"""
     try:
         model_info = get_model(pepper_type)
         target_date = pd.to_datetime(target_date)
+        type_data = model_info['data']
         
-        if pepper_type not in latest_data:
+        if type_data is None:
             raise ValueError(f"No data available for {pepper_type}")
             
-        type_data = latest_data[pepper_type]
         last_date = type_data['Date'].max()
         
         if target_date <= last_date:
-            raise ValueError(f"Date must be after {last_date.strftime('%Y-%m-%d')}")
+            raise InvalidInputError(f"Date must be after {last_date.strftime('%Y-%m-%d')}")
         
         steps = (target_date.year - last_date.year) * 12 + (target_date.month - last_date.month)
+        if steps < 1:
+            raise InvalidInputError(f"Date must be in a later month than {last_date.strftime('%Y-%m')}")
         
-        scaler = model_info['scaler']
-        seq_length = model_info['params']['seq_length']
-        scaled_data = scaler.transform(type_data[['National_Price']].values)
-        last_sequence = scaled_data[-seq_length:].reshape(1, seq_length, 1)
-        
-        current_sequence = last_sequence.copy()
-        for _ in range(steps):
-            next_pred = model_info['model'].predict(current_sequence, verbose=0)
-            current_sequence = np.roll(current_sequence, -1, axis=1)
-            current_sequence[0, -1, 0] = next_pred[0,0]
-        
-        predicted_price = float(scaler.inverse_transform(next_pred)[0,0])
+        trajectory = forecast_path(pepper_type, model_info, type_data, steps)
+        predicted_price = float(trajectory[-1])
         
         return {
             "pepper_type": pepper_type,
@@ -86,5 +163,7 @@ def predict_price(pepper_type, target_date):
             "model_accuracy": round(model_info['accuracy'], 2)
         }
         
+    except InvalidInputError:
+        raise
     except Exception as e:
         raise RuntimeError(f"Prediction failed: {str(e)}")
\ No newline at end of file
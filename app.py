@@ -8,18 +8,114 @@ warnings.filterwarnings("ignore", category=UserWarning, module="sklearn")
 
 from flask import Flask
 from flask_cors import CORS
+# Route modules only import their services (TensorFlow, CatBoost, pandas...) on first request
 from api.price_prediction.routes import price_bp
 from api.district_prediction.routes import district_bp
 from api.new_price_prediction.routes import new_price_bp
 from api.diseases_detection.routes import disease_bp
 from api.pepper_recommendation.routes import pepper_bp
 from api.deficiency_prediction.routes import deficiency_bp  
+from api.common.config import (
+    PRELOAD_MODELS,
+    PRELOAD_WORKERS,
+    PRELOAD_IN_BACKGROUND,
+    MODEL_RELOAD_INTERVAL
+)
+from api.common.warmup import preload_models, preload_in_background, preload_report
+from api.common.cache import prediction_cache
+from api.common.interpreters import active_backend
+from api.common.registry import ArtifactWatcher
 
-def create_app():
+def preload_lstm_models(max_workers):
+    """Load and trace every price and district LSTM model before serving traffic"""
+    from api.price_prediction import services as price_services
+    from api.district_prediction import services as district_services
+
+    tasks = [
+        (f"price/{pepper_type}", lambda p=pepper_type: price_services.warm_up_model(p))
+        for pepper_type in price_services.get_available_pepper_types()
+    ]
+    tasks += [
+        (f"district/{district}", lambda d=district: district_services.warm_up_model(d))
+        for district in district_services.get_available_districts()
+    ]
+    preload_models(tasks, max_workers)
+    preload_models([("district/predict-all", district_services.warm_up_batch)], 1)
+
+def preload_catboost_model():
+    """Parse the CatBoost price model before serving traffic"""
+    from api.new_price_prediction import services as new_price_services
+
+    preload_models([("catboost/price_predictor", new_price_services.warm_up_model)], 1)
+
+def preload_recommendation_map():
+    """Load or rebuild the precomputed pepper variety table"""
+    from api.pepper_recommendation.services import RecommendationTable
+
+    preload_models([
+        ("pepper/recommendation-map", lambda: {'entries': len(RecommendationTable.load())})
+    ], 1)
+
+def preload_image_models(max_workers):
+    """Load the long-lived TFLite interpreters used by the disease and deficiency endpoints"""
+    from api.diseases_detection.routes import get_disease_service
+    from api.deficiency_prediction.routes import get_deficiency_cascade
+
+    preload_models([
+        ("tflite/disease", lambda: {'version': get_disease_service().model.version}),
+        ("tflite/deficiency-cascade", lambda: get_deficiency_cascade().warm_up())
+    ], max_workers)
+
+def start_model_reloaders():
+    """Poll model directories and hot-swap changed artifacts or latest_data.csv files.
+
+    Each service's watcher starts when the service is first imported, so this
+    does not pull TensorFlow or CatBoost into a worker that has not used them.
+    """
+    ArtifactWatcher.start_all()
+
+def preload_shared_models():
+    """Load the fork-safe artifacts (CatBoost, scikit-learn, lookup tables) in the server master.
+
+    Forked workers share these pages copy-on-write. TensorFlow models and TFLite
+    interpreters are not fork-safe once used, so they stay per worker.
+    """
+    from api.pepper_recommendation.services import ClimateDataFetcher
+
+    preload_catboost_model()
+    preload_recommendation_map()
+    preload_models([("pepper/climate-indexes", ClimateDataFetcher._load_data)], 1)
+
+def preload_worker_models(max_workers):
+    """Every model this process serves, in the order requests usually need them"""
+    preload_catboost_model()
+    preload_recommendation_map()
+    preload_image_models(max_workers)
+    preload_lstm_models(max_workers)
+
+def warm_up_worker():
+    """Optional model preloading, then the artifact reloaders"""
+    if PRELOAD_MODELS:
+        preload_worker_models(PRELOAD_WORKERS)
+    
+    if MODEL_RELOAD_INTERVAL > 0:
+        start_model_reloaders()
+
+def start_worker_services():
+    """Per-process start-up, on a background thread with PRELOAD_IN_BACKGROUND so /health answers at once"""
+    if PRELOAD_IN_BACKGROUND:
+        preload_in_background(warm_up_worker)
+    else:
+        warm_up_worker()
+
+def create_app(fork_safe=False):
+    """Build the app. With `fork_safe` only shareable artifacts are loaded here and the
+    pre-fork server calls start_worker_services() in each worker (see gunicorn.conf.py)."""
     app = Flask(__name__)
     CORS(app)
     app.config['JSON_SORT_KEYS'] = False
     app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024
+    app.config['PRELOAD_MODELS'] = PRELOAD_MODELS
     
     app.register_blueprint(price_bp)
     app.register_blueprint(district_bp)
@@ -28,6 +124,11 @@ def create_app():
     app.register_blueprint(pepper_bp)
     app.register_blueprint(deficiency_bp)
     
+    if fork_safe:
+        preload_shared_models()
+    else:
+        start_worker_services()
+    
     @app.route('/')
     def home():
         return {
@@ -72,7 +173,10 @@ def create_app():
     def health_check():
         return {
             "status": "healthy",
-            "message": "All services are running"
+            "message": "All services are running",
+            "models": preload_report,
+            "prediction_cache": prediction_cache.stats(),
+            "tflite_backend": active_backend()
         }
     
     return app
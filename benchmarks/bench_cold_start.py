@@ -0,0 +1,62 @@
+import json
+import os
+import subprocess
+import sys
+
+# Each target is measured in a fresh interpreter so nothing is cached between runs.
+# The app target then idles, so imports done by background start-up threads show up too.
+IDLE_SECONDS = float(os.getenv('BENCH_IDLE_SECONDS', '15'))
+
+TARGETS = [
+    ("app (/health, then idle)", None),
+    ("price_prediction", "api.price_prediction.routes"),
+    ("district_prediction", "api.district_prediction.routes"),
+    ("new_price_prediction", "api.new_price_prediction.routes"),
+    ("diseases_detection", "api.diseases_detection.routes"),
+    ("pepper_recommendation", "api.pepper_recommendation.routes"),
+    ("deficiency_prediction", "api.deficiency_prediction.routes"),
+]
+
+IMPORT_SNIPPET = """
+import json, resource, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+heavy = sorted(name for name in ('tensorflow', 'catboost', 'sklearn', 'gdown', 'joblib', 'pandas') if name in sys.modules)
+print(json.dumps({{'seconds': seconds, 'maxrss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, 'heavy': heavy}}))
+"""
+
+APP_SNIPPET = """
+import json, resource, sys, time
+start = time.perf_counter()
+from app import create_app
+app = create_app()
+status = app.test_client().get('/health').status_code
+seconds = time.perf_counter() - start
+time.sleep({idle})
+heavy = sorted(name for name in ('tensorflow', 'catboost', 'sklearn', 'gdown', 'joblib', 'pandas') if name in sys.modules)
+print(json.dumps({{'seconds': seconds, 'maxrss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, 'heavy': heavy, 'status': status}}))
+"""
+
+
+def measure(module):
+    code = APP_SNIPPET.format(idle=IDLE_SECONDS) if module is None else IMPORT_SNIPPET.format(module=module)
+    # Default configuration (reloaders on), whatever the caller's environment sets
+    env = {k: v for k, v in os.environ.items() if k not in ("PRELOAD_MODELS", "MODEL_RELOAD_INTERVAL", "PRELOAD_IN_BACKGROUND")}
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, env=env, cwd=os.getcwd()
+    )
+    if result.returncode != 0:
+        return {"error": result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed"}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    # Run from the repository root: python -m benchmarks.bench_cold_start
+    print(f"{'target':<30}{'seconds':>9}{'peak RSS MB':>13}  heavy modules loaded")
+    for label, module in TARGETS:
+        stats = measure(module)
+        if "error" in stats:
+            print(f"{label:<30}  {stats['error']}")
+            continue
+        print(f"{label:<30}{stats['seconds']:9.2f}{stats['maxrss_kb'] / 1024:13.1f}  {', '.join(stats['heavy']) or '-'}")
@@ -0,0 +1,62 @@
+import io
+import sys
+import time
+import numpy as np
+from PIL import Image
+
+from api.deficiency_prediction.services import DeficiencyPredictionService
+from api.deficiency_prediction.leaf_identification import LeafIdentificationService
+
+
+def load_image_bytes(image_path=None):
+    """Read a sample image, or generate a synthetic 1024x768 JPEG"""
+    if image_path:
+        with open(image_path, "rb") as f:
+            return f.read()
+    pixels = (np.random.RandomState(0).rand(768, 1024, 3) * 255).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def per_request_services(image_bytes):
+    """Previous behaviour: both services and their interpreters are built for every request"""
+    LeafIdentificationService().predict_leaf_type(image_bytes)
+    DeficiencyPredictionService().predict_deficiency(image_bytes, 2)
+
+
+def make_shared_services():
+    leaf_service = LeafIdentificationService()
+    deficiency_service = DeficiencyPredictionService()
+    leaf_service.load_model()
+    deficiency_service.load_model()
+
+    def shared_services(image_bytes):
+        leaf_service.predict_leaf_type(image_bytes)
+        deficiency_service.predict_deficiency(image_bytes, 2)
+
+    return shared_services
+
+
+def measure(label, handler, image_bytes, requests):
+    handler(image_bytes)
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        handler(image_bytes)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings = np.array(timings)
+    print(f"{label:<24} p50 {np.percentile(timings, 50):8.2f} ms   "
+          f"p95 {np.percentile(timings, 95):8.2f} ms   mean {timings.mean():8.2f} ms")
+    return timings
+
+
+if __name__ == "__main__":
+    # Run from the repository root: python -m benchmarks.bench_deficiency_services [image] [requests]
+    image_bytes = load_image_bytes(sys.argv[1] if len(sys.argv) > 1 else None)
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    print(f"Deficiency request latency over {requests} requests")
+    before = measure("per-request services", per_request_services, image_bytes, requests)
+    after = measure("shared services", make_shared_services(), image_bytes, requests)
+    print(f"Speed-up (p50): {np.percentile(before, 50) / np.percentile(after, 50):.1f}x")
@@ -0,0 +1,78 @@
+import io
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from api.common.batching import MicroBatcher
+from api.common.config import DISEASE_BATCH_MAX_WAIT_MS, TFLITE_POOL_SIZE
+from api.diseases_detection.models import DiseaseDetectionModel
+
+
+def make_image_bytes(seed):
+    pixels = np.random.RandomState(seed).randint(0, 256, (300, 300, 3), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def use_batch_size(model, max_batch_size):
+    model.batcher = MicroBatcher(
+        model.predict_batch,
+        max_batch_size=max_batch_size,
+        max_wait_ms=DISEASE_BATCH_MAX_WAIT_MS,
+        workers=TFLITE_POOL_SIZE
+    )
+
+
+def measure_invoke(label, model, sizes, rounds):
+    """Per-image cost of predict_batch over batches of the given sizes"""
+    tensor = model.preprocess_image(make_image_bytes(0))
+    for size in sizes:
+        model.predict_batch([tensor] * size)
+    images = 0
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for size in sizes:
+            model.predict_batch([tensor] * size)
+            images += size
+    elapsed = time.perf_counter() - start
+    print(f"{label:<36} {elapsed / images * 1000:8.3f} ms/image")
+
+
+def measure_load(label, model, threads, requests):
+    """Wall time for `threads` clients each sending `requests` single-image predictions"""
+    images = [make_image_bytes(seed) for seed in range(threads)]
+    model.predict(images[0])
+
+    def client(image):
+        for _ in range(requests):
+            model.predict(image)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(client, images))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<36} {elapsed:8.3f} s   {threads * requests / elapsed:8.1f} images/s")
+
+
+if __name__ == "__main__":
+    # Run from the repository root: python -m benchmarks.bench_disease_batching [max_batch_size] [threads]
+    max_batch_size = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    model = DiseaseDetectionModel()
+
+    print("Interpreter cost per image")
+    use_batch_size(model, 1)
+    measure_invoke("fixed batch of 1", model, [1], 200)
+    use_batch_size(model, max_batch_size)
+    measure_invoke(f"batches of 1..{max_batch_size}, padded", model, range(1, max_batch_size + 1), 25)
+    measure_invoke(f"fixed batch of {max_batch_size}", model, [max_batch_size], 25)
+
+    print(f"\n{threads} concurrent clients, 20 requests each")
+    use_batch_size(model, 1)
+    measure_load("batching off", model, threads, 20)
+    use_batch_size(model, max_batch_size)
+    measure_load(f"batching up to {max_batch_size}", model, threads, 20)
@@ -0,0 +1,39 @@
+import sys
+import time
+import numpy as np
+
+from api.district_prediction import services
+
+TARGET_DATE = "2030-06-01"
+
+
+def measure_latency(label, predict, requests):
+    predict()
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        predict()
+        timings.append((time.perf_counter() - start) * 1000)
+    p50 = np.percentile(timings, 50)
+    print(f"{label:<28} p50 {p50:8.2f} ms   p95 {np.percentile(timings, 95):8.2f} ms")
+    return p50
+
+
+if __name__ == "__main__":
+    # Run from the repository root: python -m benchmarks.bench_district_batch [requests]
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    districts = sorted(services.get_available_districts())
+    for district in districts:
+        services.get_district_model(district)
+
+    print(f"District forecast latency to {TARGET_DATE} over {requests} calls")
+    single = measure_latency("one district", lambda: services.predict_district_price(districts[0], TARGET_DATE), requests)
+    looped = measure_latency(
+        f"{len(districts)} districts, one by one",
+        lambda: [services.predict_district_price(d, TARGET_DATE) for d in districts],
+        requests
+    )
+    stacked = measure_latency(f"{len(districts)} districts, stacked", lambda: services.predict_all_districts(TARGET_DATE), requests)
+    measure_latency("3 districts, stacked", lambda: services.predict_all_districts(TARGET_DATE, districts[:3]), requests)
+    print(f"Stacked batch costs {stacked / single:.1f}x one district, {looped / stacked:.1f}x faster than the loop")
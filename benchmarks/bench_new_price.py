@@ -0,0 +1,86 @@
+import sys
+import time
+import numpy as np
+import pandas as pd
+from flask import Flask
+
+from api.new_price_prediction.routes import new_price_bp
+from api.new_price_prediction.services import MODEL_PATH, PricePredictionService, get_service
+
+PAYLOAD = {
+    "rainfall": 180.5,
+    "price_type": "GR1",
+    "inflation_rate": 6.2,
+    "seasonality": "YES"
+}
+
+
+def per_request_service(payload):
+    """Previous behaviour: the .cbm file is parsed for every request"""
+    return PricePredictionService(MODEL_PATH, compiled=False).validate_and_predict(payload)
+
+
+def shared_service(payload):
+    return get_service().validate_and_predict(payload)
+
+
+def make_model_scorers():
+    """Single-row scoring paths on already validated input, without schema validation"""
+    service = PricePredictionService(MODEL_PATH, compiled=True)
+    model = service.model
+    processed = service._preprocess_input(PAYLOAD)
+
+    return [
+        ("DataFrame + predict", lambda: model.model.predict(pd.DataFrame([processed])[model.columns_order])),
+        ("NumPy + predict", lambda: model.model.predict(service._to_features([PAYLOAD]))),
+        ("NumPy + compiled trees", lambda: model.compiled.predict(service._to_features([PAYLOAD])))
+    ]
+
+
+def measure_latency(label, scorer, requests):
+    scorer()
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        scorer()
+        timings.append((time.perf_counter() - start) * 1e6)
+    print(f"{label:<24} p50 {np.percentile(timings, 50):8.1f} us   p95 {np.percentile(timings, 95):8.1f} us")
+
+
+def make_endpoint_client():
+    app = Flask(__name__)
+    app.register_blueprint(new_price_bp)
+    client = app.test_client()
+
+    def endpoint(payload):
+        response = client.post("/api/new-price/predict", json=payload)
+        assert response.status_code == 200, response.get_json()
+        return response.get_json()["predicted_price"]
+
+    return endpoint
+
+
+def measure(label, handler, requests):
+    handler(PAYLOAD)
+    start = time.perf_counter()
+    for _ in range(requests):
+        handler(PAYLOAD)
+    elapsed = time.perf_counter() - start
+    rate = requests / elapsed
+    print(f"{label:<24} {rate:10.1f} req/s   {elapsed / requests * 1000:8.3f} ms/request")
+    return rate
+
+
+if __name__ == "__main__":
+    # Run from the repository root: python -m benchmarks.bench_new_price [requests]
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    print(f"CatBoost price prediction throughput over {requests} requests")
+    before = measure("per-request model load", per_request_service, requests)
+    after = measure("shared registry", shared_service, requests)
+    measure("/predict endpoint", make_endpoint_client(), requests)
+    print(f"Speed-up: {after / before:.1f}x")
+
+    print(f"\nSingle-row scoring latency over {requests} calls")
+    for label, scorer in make_model_scorers():
+        measure_latency(label, scorer, requests)
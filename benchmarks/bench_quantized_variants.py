@@ -0,0 +1,108 @@
+import glob
+import os
+import sys
+import time
+import numpy as np
+
+from api.common.images import image_to_tensor
+from api.common.interpreters import PooledInterpreter
+from api.diseases_detection.models import CLASS_NAMES as DISEASE_CLASSES
+from api.deficiency_prediction.services import DeficiencyPredictionService
+from api.deficiency_prediction.leaf_identification import LeafIdentificationService
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp')
+
+# Float models; variants are the `<name>_<suffix>.tflite` files next to them
+MODELS = [
+    ("disease", "pickle_models/final_pepper_model.tflite", DISEASE_CLASSES),
+    ("deficiency", "models/DiseaseIdentificationTfLite.tflite", DeficiencyPredictionService().classes),
+    ("leaf", "models/leafIdentification.tflite", LeafIdentificationService().classes),
+]
+
+
+def current_rss_mb():
+    """Resident set size of this process, None where /proc is not available"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        return None
+
+
+def load_images(folder):
+    """(bytes, label) for every image below `folder`, the label is the name of its sub-folder"""
+    images = []
+    for path in sorted(glob.glob(os.path.join(folder, "**", "*"), recursive=True)):
+        if path.lower().endswith(IMAGE_EXTENSIONS):
+            parent = os.path.dirname(path)
+            label = os.path.basename(parent) if os.path.abspath(parent) != os.path.abspath(folder) else None
+            with open(path, "rb") as f:
+                images.append((f.read(), label))
+    return images
+
+
+def find_variants(model_path):
+    root, ext = os.path.splitext(model_path)
+    variants = [("float", model_path)] if os.path.exists(model_path) else []
+    for path in sorted(glob.glob(f"{root}_*{ext}")):
+        variants.append((path[len(root) + 1:-len(ext)], path))
+    return variants
+
+
+def run_variant(model_path, images):
+    """Top-1 class per image, per-image latencies in ms and the RSS growth of loading the model"""
+    rss_before = current_rss_mb()
+    interpreter = PooledInterpreter(model_path)
+    size = tuple(int(dim) for dim in interpreter.input_details[0]["shape"][1:3])
+    tensors = [image_to_tensor(image_bytes, (size[1], size[0])) for image_bytes, _ in images]
+    interpreter.invoke(tensors[0])
+    rss_after = current_rss_mb()
+
+    predictions = []
+    timings = []
+    for tensor in tensors:
+        start = time.perf_counter()
+        output = interpreter.invoke(tensor)
+        timings.append((time.perf_counter() - start) * 1000)
+        predictions.append(int(np.argmax(output)))
+    rss_delta = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+    return np.array(predictions), np.array(timings), rss_delta
+
+
+def report(name, model_path, classes, images):
+    variants = find_variants(model_path)
+    if not variants:
+        print(f"\n{name}: no model at {model_path}")
+        return
+
+    labels = [label for _, label in images]
+    labelled = [i for i, label in enumerate(labels) if label in classes]
+    print(f"\n{name} ({len(images)} images, {len(labelled)} with a known label)")
+    print(f"{'variant':<12}{'file MB':>9}{'RSS MB':>9}{'p50 ms':>9}{'p95 ms':>9}{'agree':>8}{'top-1':>8}")
+
+    reference = None
+    for variant, path in variants:
+        predictions, timings, rss_delta = run_variant(path, images)
+        if reference is None:
+            reference = predictions
+        agreement = float(np.mean(predictions == reference))
+        accuracy = (
+            f"{np.mean([classes[predictions[i]] == labels[i] for i in labelled]):8.3f}" if labelled else f"{'-':>8}"
+        )
+        rss = f"{rss_delta:9.1f}" if rss_delta is not None else f"{'-':>9}"
+        print(f"{variant:<12}{os.path.getsize(path) / (1024 * 1024):9.2f}{rss}"
+              f"{np.percentile(timings, 50):9.2f}{np.percentile(timings, 95):9.2f}{agreement:8.3f}{accuracy}")
+
+
+if __name__ == "__main__":
+    # Run from the repository root: python -m benchmarks.bench_quantized_variants <image folder>
+    # Images in sub-folders named after a class also get a top-1 accuracy column.
+    if len(sys.argv) < 2:
+        sys.exit("usage: python -m benchmarks.bench_quantized_variants <image folder>")
+    images = load_images(sys.argv[1])
+    if not images:
+        sys.exit(f"No images found in {sys.argv[1]}")
+
+    print("Agreement is top-1 agreement with the float model")
+    for name, model_path, classes in MODELS:
+        report(name, model_path, classes, images)
@@ -0,0 +1,26 @@
+# gunicorn.conf.py
+import gc
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('WEB_CONCURRENCY', '2'))
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
+
+# Import wsgi:app in the master before forking, so the CatBoost, scikit-learn and
+# lookup-table pages loaded there are shared copy-on-write by every worker.
+# TFLite flatbuffers are memory-mapped and shared through the page cache anyway.
+# TensorFlow/Keras models and TFLite interpreters must not run before fork,
+# they are loaded lazily (or by PRELOAD_MODELS) inside each worker.
+preload_app = True
+
+
+def pre_fork(server, worker):
+    # Keep the garbage collector from writing to shared objects and un-sharing their pages
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from app import start_worker_services
+
+    start_worker_services()
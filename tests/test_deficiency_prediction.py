@@ -0,0 +1,152 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from api.common import cache
+from api.deficiency_prediction.cascade import CASCADE_MODES, DeficiencyCascade
+from api.deficiency_prediction.leaf_identification import LeafIdentificationService
+from api.deficiency_prediction.services import DeficiencyPredictionService
+
+PEPPER = 11  # index of 'Pepper' in LeafIdentificationService.classes
+
+
+def leaf_probabilities(leaf_class, confidence):
+    row = np.full(14, (1 - confidence) / 13, dtype=np.float32)
+    row[leaf_class] = confidence
+    return row
+
+
+# Pepper leaf, pepper below the threshold, not a pepper leaf, pepper leaf
+LEAF = np.stack([
+    leaf_probabilities(PEPPER, 0.95),
+    leaf_probabilities(PEPPER, 0.6),
+    leaf_probabilities(3, 0.9),
+    leaf_probabilities(PEPPER, 0.85)
+])
+DEFICIENCY = np.array([
+    [0.1, 0.1, 0.7, 0.1],
+    [0.7, 0.1, 0.1, 0.1],
+    [0.1, 0.1, 0.1, 0.7],
+    [0.05, 0.85, 0.05, 0.05]
+], dtype=np.float32)
+
+
+def fake_cascade(mode, deficiency_calls):
+    leaf_service = LeafIdentificationService()
+    deficiency_service = DeficiencyPredictionService()
+
+    def predict_leaf(batch):
+        return LEAF[batch[:, 0, 0, 0].astype(int)]
+
+    def predict_deficiency(batch):
+        rows = batch[:, 0, 0, 0].astype(int)
+        deficiency_calls.append(list(rows))
+        return DEFICIENCY[rows]
+
+    def predict_combined(batch, leaf_class_count):
+        assert leaf_class_count == len(leaf_service.classes)
+        rows = batch[:, 0, 0, 0].astype(int)
+        return LEAF[rows], DEFICIENCY[rows]
+
+    leaf_service.predict_probabilities = predict_leaf
+    deficiency_service.predict_probabilities = predict_deficiency
+    deficiency_service.predict_combined = predict_combined
+    return DeficiencyCascade(leaf_service, deficiency_service, threshold=0.8, mode=mode)
+
+
+def image_batch(rows):
+    # The first pixel carries the row index, so the fakes know which image they got
+    batch = np.zeros((len(rows), 64, 64, 3), dtype=np.float32)
+    batch[:, 0, 0, 0] = rows
+    return batch
+
+
+@pytest.mark.parametrize("mode", CASCADE_MODES)
+def test_cascade_gates_non_pepper_leaves(mode):
+    results = fake_cascade(mode, []).run_batch(image_batch([0, 1, 2, 3]), age=2)
+
+    assert [leaf['predicted_class'] for leaf, _ in results] == ['Pepper', 'Pepper', 'Basil', 'Pepper']
+    assert [result is None for _, result in results] == [False, True, True, False]
+    assert results[0][1]['predicted_class'] == 'Magnesium'
+    assert results[0][1]['recommendation_count'] == len(results[0][1]['fertilizers'])
+    assert results[3][1]['predicted_class'] == 'Heathly'
+    assert results[3][1]['fertilizers'] == []
+
+
+def test_cascade_modes_agree():
+    batch = image_batch([3, 2, 1, 0])
+    outputs = [fake_cascade(mode, []).run_batch(batch, age=5) for mode in CASCADE_MODES]
+
+    for output in outputs[1:]:
+        assert output == outputs[0]
+
+
+def test_sequential_mode_only_classifies_gated_images():
+    calls = []
+    fake_cascade('sequential', calls).run_batch(image_batch([0, 1, 2, 3]), age=2)
+
+    assert calls == [[0, 3]]
+
+
+def test_sequential_mode_skips_deficiency_model_when_gate_fails():
+    calls = []
+    leaf_type, result = fake_cascade('sequential', calls).run(image_batch([2]), age=2)
+
+    assert result is None
+    assert leaf_type['predicted_class'] == 'Basil'
+    assert calls == []
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        DeficiencyCascade(LeafIdentificationService(), DeficiencyPredictionService(), mode='parallel')
+
+
+def test_prediction_cache_counts_hits_and_evicts_least_recently_used():
+    predictions = cache.PredictionCache(max_entries=2, ttl=600)
+    computed = []
+
+    def compute(key):
+        return lambda: computed.append(key) or {'predicted_class': key}
+
+    for key in ('a', 'b', 'a', 'c', 'b'):
+        predictions.get_or_compute(key, compute(key))
+
+    assert computed == ['a', 'b', 'c', 'b']
+    stats = predictions.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (1, 4, 2)
+    assert stats['entries'] == 2
+
+
+def test_prediction_cache_expires_entries_after_ttl(monkeypatch):
+    clock = SimpleNamespace(now=100.0)
+    monkeypatch.setattr(cache, 'time', SimpleNamespace(monotonic=lambda: clock.now))
+    predictions = cache.PredictionCache(max_entries=8, ttl=60)
+    computed = []
+
+    predictions.get_or_compute('a', lambda: computed.append(1) or {})
+    clock.now += 59
+    predictions.get_or_compute('a', lambda: computed.append(2) or {})
+    clock.now += 2
+    predictions.get_or_compute('a', lambda: computed.append(3) or {})
+
+    assert computed == [1, 3]
+    assert predictions.stats()['expirations'] == 1
+
+
+def test_prediction_cache_hands_out_copies():
+    predictions = cache.PredictionCache()
+    predictions.get_or_compute('a', lambda: {'fertilizers': ['Epsom salt']})
+
+    predictions.get_or_compute('a', lambda: None)['fertilizers'].append('edited')
+
+    assert predictions.get_or_compute('a', lambda: None) == {'fertilizers': ['Epsom salt']}
+
+
+def test_image_key_depends_on_model_version_and_age():
+    image = b'leaf photo'
+
+    assert cache.image_key(image, 'deficiency', 'v1', 2) == cache.image_key(image, 'deficiency', 'v1', 2)
+    assert cache.image_key(image, 'deficiency', 'v1', 2) != cache.image_key(image, 'deficiency', 'v2', 2)
+    assert cache.image_key(image, 'deficiency', 'v1', 2) != cache.image_key(image, 'deficiency', 'v1', 3)
@@ -0,0 +1,188 @@
+import io
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+from flask import Flask
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+
+from api.common.batching import MicroBatcher
+from api.common.interpreters import dequantize, quantize, resolve_model_variant, tensor_quantization
+from api.diseases_detection import routes, services
+from api.diseases_detection.models import CLASS_NAMES, DiseaseDetectionModel
+
+
+class FakeModel(DiseaseDetectionModel):
+    """Real preprocessing and formatting, the class is read back from the red channel"""
+
+    def __init__(self):
+        self.class_names = CLASS_NAMES
+        self.treatments = {}
+        self.version = 'test'
+        self.pool = self
+        self.batcher = MicroBatcher(self.predict_batch, max_batch_size=1)
+        self.batch_shapes = []
+
+    def run(self, batch):
+        self.batch_shapes.append(batch.shape)
+        classes = np.rint(batch[:, 0, 0, 0] * 255 / 50).astype(int)
+        return np.eye(len(CLASS_NAMES), dtype=np.float32)[classes]
+
+
+def png_bytes(disease_index):
+    buffer = io.BytesIO()
+    Image.new('RGB', (32, 32), (disease_index * 50, 0, 0)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def upload(data, filename):
+    return FileStorage(stream=io.BytesIO(data), filename=filename)
+
+
+def test_uploads_are_preprocessed_from_memory_like_files_on_disk(tmp_path):
+    model = FakeModel()
+    image_path = tmp_path / 'leaf.png'
+    image_path.write_bytes(png_bytes(2))
+
+    from_disk = model.preprocess_image(str(image_path))
+
+    np.testing.assert_array_equal(model.preprocess_image(png_bytes(2)), from_disk)
+    np.testing.assert_array_equal(model.preprocess_image(io.BytesIO(png_bytes(2))), from_disk)
+    assert from_disk.shape == (1, 244, 244, 3)
+
+
+def test_single_prediction_never_writes_the_upload(tmp_path, monkeypatch):
+    monkeypatch.setattr(services, 'DiseaseDetectionModel', FakeModel)
+    monkeypatch.chdir(tmp_path)
+
+    result = services.DiseaseDetectionService().predict_disease(upload(png_bytes(3), 'leaf.png'))
+
+    assert result['disease'] == 'Vine borer Infection'
+    assert os.listdir(tmp_path) == []
+
+
+def test_batch_records_share_the_deficiency_shape(monkeypatch):
+    monkeypatch.setattr(services, 'DiseaseDetectionModel', FakeModel)
+    files = [
+        upload(png_bytes(1), 'leaf.png'),
+        upload(b'plain text', 'notes.txt'),
+        upload(b'not an image', 'broken.png'),
+        upload(png_bytes(4), 'other.png')
+    ]
+
+    records = list(services.DiseaseDetectionService().predict_disease_batch(files))
+
+    assert [record['index'] for record in records] == [0, 1, 2, 3]
+    assert [record['status'] for record in records] == ['success', 'error', 'error', 'success']
+    assert set(records[0]) == {'index', 'filename', 'status', 'data'}
+    assert set(records[1]) == {'index', 'filename', 'status', 'message'}
+    assert records[0]['data']['disease'] == 'Lace Bug Infection'
+    assert records[3]['data']['disease'] == 'Yellow Mottle Infection'
+    assert records[1]['message'].startswith('Invalid file type')
+    assert records[2]['message'] == 'Uploaded file is not a valid image'
+
+
+def test_batch_endpoint_streams_one_json_line_per_upload(monkeypatch):
+    monkeypatch.setattr(services, 'DiseaseDetectionModel', FakeModel)
+    monkeypatch.setattr(routes, '_disease_service', services.DiseaseDetectionService())
+    app = Flask(__name__)
+    app.register_blueprint(routes.disease_bp)
+    files = [(io.BytesIO(png_bytes(index)), f'leaf{index}.png') for index in (0, 1)]
+    files.append((io.BytesIO(b'plain text'), 'notes.txt'))
+
+    response = app.test_client().post('/api/disease/predict-batch', data={'files': files})
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    records = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [(record['filename'], record['status']) for record in records] == [
+        ('leaf0.png', 'success'), ('leaf1.png', 'success'), ('notes.txt', 'error')
+    ]
+    assert records[1]['data']['disease'] == 'Lace Bug Infection'
+
+
+def test_batch_endpoint_rejects_too_many_files(monkeypatch):
+    monkeypatch.setattr(routes, 'BATCH_MAX_FILES', 2)
+    app = Flask(__name__)
+    app.register_blueprint(routes.disease_bp)
+    files = [(io.BytesIO(png_bytes(0)), f'leaf{index}.png') for index in range(3)]
+
+    response = app.test_client().post('/api/disease/predict-batch', data={'files': files})
+
+    assert response.status_code == 400
+
+
+def test_micro_batcher_scatters_results_to_their_callers():
+    batch_sizes = []
+
+    def run_batch(items):
+        batch_sizes.append(len(items))
+        time.sleep(0.01)
+        return [item * 10 for item in items]
+
+    batcher = MicroBatcher(run_batch, max_batch_size=4, max_wait_ms=50)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(batcher.submit, range(8)))
+
+    assert results == [item * 10 for item in range(8)]
+    assert sum(batch_sizes) == 8
+    assert max(batch_sizes) <= 4
+
+
+def test_micro_batcher_fails_every_caller_of_a_failed_batch():
+    def run_batch(items):
+        raise RuntimeError("interpreter failed")
+
+    batcher = MicroBatcher(run_batch, max_batch_size=4, max_wait_ms=20)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(batcher.submit, item) for item in range(3)]
+
+    for future in futures:
+        with pytest.raises(RuntimeError, match="interpreter failed"):
+            future.result()
+
+
+def test_disease_batches_are_padded_to_one_shape():
+    model = FakeModel()
+    model.batcher = MicroBatcher(model.predict_batch, max_batch_size=4)
+    tensors = [model.preprocess_image(png_bytes(index)) for index in (1, 3)]
+
+    outputs = model.predict_batch(tensors)
+
+    assert [model.format_prediction(output)['disease'] for output in outputs] == [CLASS_NAMES[1], CLASS_NAMES[3]]
+    assert model.batch_shapes == [(4, 244, 244, 3)]
+
+
+@pytest.mark.parametrize("dtype, zero_point", [(np.int8, -3), (np.uint8, 128)])
+def test_quantize_round_trip_stays_within_half_a_step(dtype, zero_point):
+    quantization = tensor_quantization({'dtype': dtype, 'quantization': (1 / 255, zero_point)})
+    values = np.random.RandomState(0).uniform(-0.2, 0.2, (2, 8, 8, 3)).astype(np.float32)
+
+    quantized = quantize(values, quantization)
+
+    assert quantized.dtype == dtype
+    np.testing.assert_allclose(dequantize(quantized, quantization), values, atol=0.5 / 255 + 1e-7)
+
+
+def test_quantize_saturates_out_of_range_values():
+    quantization = (0.01, 0, np.int8)
+
+    assert quantize(np.array([5.0, -5.0]), quantization).tolist() == [127, -128]
+
+
+def test_float_tensors_have_no_quantization():
+    assert tensor_quantization({'dtype': np.float32, 'quantization': (0.0, 0)}) is None
+    assert tensor_quantization({'dtype': np.int8, 'quantization': (0.0, 0)}) is None
+
+
+def test_model_variant_falls_back_to_the_float_model(tmp_path):
+    float_path = str(tmp_path / 'model.tflite')
+    (tmp_path / 'model_int8.tflite').write_bytes(b'')
+
+    assert resolve_model_variant(float_path, 'int8') == str(tmp_path / 'model_int8.tflite')
+    assert resolve_model_variant(float_path, 'float16') == float_path
+    assert resolve_model_variant(float_path, 'float') == float_path
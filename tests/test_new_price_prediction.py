@@ -0,0 +1,61 @@
+import os
+
+import numpy as np
+import pytest
+
+catboost = pytest.importorskip("catboost")
+
+from api.new_price_prediction.models import CompiledTrees, PricePredictionModel
+
+MODEL_PATH = os.path.join("pickle_models", "price_predictor.cbm")
+
+
+def train_model(depth):
+    rng = np.random.RandomState(depth)
+    features = rng.rand(300, 7) * [3000, 20, 1, 1, 1, 1, 1]
+    target = features[:, 0] * 0.1 + features[:, 1] * 5 + rng.rand(300)
+    model = catboost.CatBoostRegressor(iterations=40, depth=depth, verbose=0, thread_count=1, random_seed=0, allow_writing_files=False)
+    model.fit(features, target)
+    return model, features
+
+
+@pytest.mark.parametrize("depth", [1, 4, 6])
+def test_compiled_trees_match_catboost(depth):
+    model, features = train_model(depth)
+    rows = np.vstack([features[:50], np.random.RandomState(7).rand(50, 7) * [4000, 30, 1, 1, 1, 1, 1]])
+
+    np.testing.assert_allclose(CompiledTrees(model).predict(rows), model.predict(rows), rtol=1e-9, atol=1e-9)
+
+
+def test_compiled_trees_match_catboost_on_borders():
+    model, _ = train_model(4)
+    compiled = CompiledTrees(model)
+    # Values exactly on a border, and just either side of it, exercise the > comparison
+    rows = np.tile(np.median(np.random.RandomState(2).rand(20, 7), axis=0), (len(compiled.borders) * 3, 1))
+    for i, (feature, border) in enumerate(zip(compiled.border_features, compiled.borders)):
+        for j, value in enumerate((np.nextafter(border, -np.inf), border, np.nextafter(border, np.inf))):
+            rows[i * 3 + j, feature] = value
+
+    np.testing.assert_allclose(compiled.predict(rows), model.predict(rows), rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.skipif(not os.path.exists(MODEL_PATH), reason="price_predictor.cbm not available")
+def test_compiled_scoring_matches_shipped_model():
+    plain = PricePredictionModel().load_model(MODEL_PATH)
+    compiled = PricePredictionModel().load_model(MODEL_PATH, compiled=True)
+    rng = np.random.RandomState(0)
+    features = np.column_stack([
+        rng.uniform(0, 4000, 16), rng.uniform(-5, 25, 16),
+        np.eye(2)[rng.randint(0, 2, 16)], np.eye(3)[rng.randint(0, 3, 16)]
+    ])
+
+    assert compiled.compiled is not None
+    np.testing.assert_allclose(compiled.predict(features), plain.predict(features), rtol=1e-9, atol=1e-9)
+
+
+def test_grid_axis_with_overflowing_step_is_rejected():
+    from api.new_price_prediction.services import _axis_length
+
+    with pytest.raises(ValueError, match="too many points"):
+        _axis_length({'start': 0, 'stop': 100, 'step': 1e-320})
+    assert _axis_length({'start': 0, 'stop': 100, 'step': 10}) == 11
@@ -0,0 +1,81 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from flask import Flask
+
+from api.pepper_recommendation.routes import pepper_bp
+from api.pepper_recommendation.services import (
+    ClimateDataFetcher,
+    PepperRecommendationService,
+    RecommendationTable
+)
+
+MODEL_PATH = os.path.join("models", "recommendation_model.joblib")
+
+pytestmark = pytest.mark.skipif(not os.path.exists(MODEL_PATH), reason="recommendation model not available")
+
+
+def test_recommendation_table_matches_live_inference(tmp_path):
+    table = RecommendationTable.build(path=str(tmp_path / "recommendation_map.joblib"))
+
+    assert table
+    assert os.listdir(tmp_path) == ["recommendation_map.joblib"]
+    for row, variety in table.items():
+        assert PepperRecommendationService.predict_pepper(*row) == variety
+
+
+def test_recommendation_table_covers_every_encodable_row(tmp_path):
+    table = RecommendationTable.build(path=str(tmp_path / "recommendation_map.joblib"))
+    encodable = [
+        row for row in ClimateDataFetcher.known_feature_rows()
+        if PepperRecommendationService.can_encode(row)
+    ]
+
+    assert set(table) == set(encodable)
+
+
+def test_unknown_category_names_the_column():
+    row = next(iter(ClimateDataFetcher.known_feature_rows()))
+
+    assert PepperRecommendationService.unknown_category(row) is None
+    position, known = PepperRecommendationService.unknown_category(row[:4] + ("Not a soil",) + row[5:])
+    assert position == 4
+    assert row[4] in known
+
+
+def test_concurrent_first_loads_build_the_table_once(tmp_path, monkeypatch):
+    builds = []
+
+    def slow_build(path, hashes):
+        builds.append(path)
+        time.sleep(0.05)
+        return {}
+
+    monkeypatch.setattr(RecommendationTable, "_table", None)
+    monkeypatch.setattr(RecommendationTable, "build", slow_build)
+    path = str(tmp_path / "recommendation_map.joblib")
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda _: RecommendationTable.load(path), range(8)))
+
+    assert builds == [path]
+
+
+def test_catalog_answers_matching_etag_with_304():
+    app = Flask(__name__)
+    app.register_blueprint(pepper_bp)
+    client = app.test_client()
+
+    first = client.get("/api/pepper/catalog")
+    etag = first.headers["ETag"]
+    revalidated = client.get("/api/pepper/catalog", headers={"If-None-Match": etag})
+    stale = client.get("/api/pepper/catalog", headers={"If-None-Match": '"outdated"'})
+
+    assert first.status_code == 200
+    assert first.get_json()
+    assert "max-age" in first.headers["Cache-Control"]
+    assert revalidated.status_code == 304
+    assert revalidated.data == b""
+    assert stale.status_code == 200
+    assert stale.headers["ETag"] == etag
@@ -0,0 +1,224 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+tf = pytest.importorskip("tensorflow")
+
+from api.common.forecasting import ForecastCache, ForecastEngine, StackedForecastEngine, stack_layout
+from api.common.registry import ArtifactWatcher, ModelRegistry
+
+PRICE_MODELS = os.path.join("api", "price_prediction", "pickle_models", "GR1")
+DISTRICT_MODELS = os.path.join("api", "district_prediction", "district_models")
+
+
+def build_lstm(seed, seq_length=6):
+    tf.keras.utils.set_random_seed(seed)
+    model = tf.keras.Sequential([
+        tf.keras.layers.LSTM(8, input_shape=(seq_length, 1)),
+        tf.keras.layers.Dense(1)
+    ])
+    return model
+
+
+def keras_loop(model, sequence, steps):
+    """The month-by-month model.predict loop the compiled rollout replaced"""
+    window = np.array(sequence, dtype=np.float32)
+    path = []
+    for _ in range(steps):
+        next_value = model.predict(window, verbose=0)[:, 0]
+        path.append(next_value)
+        window = np.concatenate([window[:, 1:, :], next_value[:, np.newaxis, np.newaxis]], axis=1)
+    return np.stack(path, axis=1)
+
+
+def test_compiled_rollout_matches_keras_loop():
+    model = build_lstm(0)
+    sequence = np.random.RandomState(0).rand(1, 6, 1).astype(np.float32)
+
+    expected = keras_loop(model, sequence, 8)
+    actual = ForecastEngine(model).rollout(sequence, 8)
+
+    assert actual.shape == (1, 8)
+    np.testing.assert_allclose(actual, expected, rtol=1e-5, atol=1e-6)
+
+
+def test_compiled_rollout_prefix_is_stable():
+    engine = ForecastEngine(build_lstm(1))
+    sequence = np.random.RandomState(1).rand(1, 6, 1).astype(np.float32)
+
+    np.testing.assert_allclose(engine.rollout(sequence, 3), engine.rollout(sequence, 10)[:, :3], rtol=1e-6)
+
+
+def test_rollout_rejects_empty_horizon():
+    with pytest.raises(ValueError):
+        ForecastEngine(build_lstm(2)).rollout(np.zeros((1, 6, 1)), 0)
+
+
+def test_stacked_rollout_matches_each_model():
+    models = [build_lstm(3), build_lstm(4, seq_length=3), build_lstm(5)]
+    rng = np.random.RandomState(3)
+    sequences = [rng.rand(1, model.input_shape[1], 1).astype(np.float32) for model in models]
+    layouts = [stack_layout(model) for model in models]
+    weights = [np.stack(arrays) for arrays in zip(*(w for _, w in layouts))]
+
+    stacked = StackedForecastEngine(layouts[0][0], 6).rollout(sequences, 5, weights)
+
+    for i, model in enumerate(models):
+        np.testing.assert_allclose(stacked[i], keras_loop(model, sequences[i], 5)[0], rtol=1e-5, atol=1e-6)
+
+
+@pytest.mark.skipif(not os.path.isdir(PRICE_MODELS), reason="GR1 price model not available")
+def test_same_month_target_date_is_invalid_input():
+    import pandas as pd
+    from api.common.errors import InvalidInputError
+    from api.price_prediction.services import get_model, predict_price
+
+    last_date = get_model("GR1")["data"]["Date"].max()
+    same_month = last_date + pd.offsets.MonthEnd(0)
+    if same_month == last_date:
+        pytest.skip("last observation is on the last day of its month")
+
+    with pytest.raises(InvalidInputError):
+        predict_price("GR1", same_month.strftime("%Y-%m-%d"))
+
+
+@pytest.mark.skipif(not os.path.isdir(DISTRICT_MODELS), reason="district models not available")
+def test_district_subsets_match_single_predictions():
+    from api.district_prediction import services
+
+    districts = sorted(services.get_available_districts())[:5]
+    target_date = "2026-03-01"
+    single = {
+        district: services.predict_district_price(district, target_date)["predicted_price"]
+        for district in districts
+    }
+
+    for subset in (districts, districts[::-1], districts[1:4], [districts[3], districts[0]]):
+        result = services.predict_all_districts(target_date, subset)
+        assert [p["district"] for p in result["predictions"]] == subset
+        for prediction in result["predictions"]:
+            assert prediction["predicted_price"] == pytest.approx(single[prediction["district"]], abs=0.011)
+
+    # One stacked engine per architecture and padded window length, never per subset
+    bundles = [services.get_district_model(d) for d in districts]
+    windows = {(services._group_key(b), b['params']['seq_length']) for b in bundles}
+    assert len(services.stacked_engines) <= len(windows)
+
+
+@pytest.mark.skipif(not os.path.isdir(DISTRICT_MODELS), reason="district models not available")
+def test_district_same_month_target_date_is_invalid_input():
+    import pandas as pd
+    from api.common.errors import InvalidInputError
+    from api.district_prediction.services import get_district_model, predict_district_price
+
+    last_date = get_district_model("Kandy")["data"]["Date"].max()
+    same_month = last_date + pd.offsets.MonthEnd(0)
+    if same_month == last_date:
+        pytest.skip("last observation is on the last day of its month")
+
+    with pytest.raises(InvalidInputError):
+        predict_district_price("Kandy", same_month.strftime("%Y-%m-%d"))
+
+
+def test_registry_loads_each_key_once_for_concurrent_callers():
+    loads = []
+
+    def slow_loader(key):
+        loads.append(key)
+        time.sleep(0.05)
+        return {'version': 1}
+
+    registry = ModelRegistry(slow_loader)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        bundles = list(executor.map(lambda _: registry.get("GR1"), range(8)))
+
+    assert loads == ["GR1"]
+    assert all(bundle is bundles[0] for bundle in bundles)
+
+
+def test_registry_does_not_cache_failed_loads():
+    attempts = []
+
+    def flaky_loader(key):
+        attempts.append(key)
+        if len(attempts) == 1:
+            raise OSError("model file is being replaced")
+        return {'version': 1}
+
+    registry = ModelRegistry(flaky_loader)
+    with pytest.raises(OSError):
+        registry.get("GR1")
+
+    assert registry.get("GR1")['version'] == 1
+    assert attempts == ["GR1", "GR1"]
+
+
+def test_registry_evicts_least_recently_used_bundles():
+    evicted = []
+    registry = ModelRegistry(lambda key: {'version': key}, max_entries=2, sizeof=None)
+    registry.add_listener(lambda key, bundle: evicted.append(key))
+
+    for key in ("GR1", "GR2", "GR1", "White"):
+        registry.get(key)
+
+    assert registry.keys() == ["GR1", "White"]
+    assert evicted == ["GR2"]
+
+
+def test_registry_stays_under_its_byte_cap():
+    sizes = {"GR1": 60, "GR2": 30, "White": 50}
+    registry = ModelRegistry(lambda key: {'size': sizes[key]}, max_bytes=100, sizeof=lambda bundle: bundle['size'])
+
+    for key in ("GR1", "GR2", "White"):
+        registry.get(key)
+
+    assert registry.keys() == ["GR2", "White"]
+    assert registry.stats()['estimated_bytes'] == 80
+
+
+def test_watcher_swaps_changed_bundles_and_drops_their_forecasts():
+    versions = {"GR1": 1, "GR2": 1}
+    registry = ModelRegistry(lambda key: {'version': versions[key]})
+    cache = ForecastCache()
+    registry.add_listener(lambda key, bundle: cache.invalidate(key))
+    for key in versions:
+        registry.get(key)
+        cache.get_path((key, "2030-01"), 3, np.arange)
+    unchanged = registry.peek("GR2")
+
+    versions["GR1"] = 2
+    assert ArtifactWatcher(registry, versions.get, 60).check() == ["GR1"]
+
+    assert registry.peek("GR1")['version'] == 2
+    assert registry.peek("GR2") is unchanged
+    recomputed = []
+    for key in versions:
+        cache.get_path((key, "2030-01"), 3, lambda steps, key=key: recomputed.append(key) or np.arange(steps))
+    assert recomputed == ["GR1"]
+
+
+def test_watcher_keeps_the_current_bundle_when_a_reload_fails():
+    versions = {"GR1": 1}
+    broken = []
+
+    def loader(key):
+        if broken:
+            raise OSError("model file is half written")
+        return {'version': versions[key]}
+
+    registry = ModelRegistry(loader)
+    current = registry.get("GR1")
+    watcher = ArtifactWatcher(registry, versions.get, 60)
+    assert watcher.check() == []
+
+    versions["GR1"] = 2
+    broken.append(True)
+    assert watcher.check() == []
+    assert registry.peek("GR1") is current
+
+    broken.clear()
+    assert watcher.check() == ["GR1"]
+    assert registry.peek("GR1")['version'] == 2
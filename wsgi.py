@@ -0,0 +1,10 @@
+# wsgi.py
+"""WSGI entry point for pre-fork servers: gunicorn -c gunicorn.conf.py wsgi:app
+
+The app is built once in the server master with only fork-safe artifacts loaded,
+so workers share those read-only pages. gunicorn.conf.py starts the per-worker
+services after each fork.
+"""
+from app import create_app
+
+app = create_app(fork_safe=True)